@@ -0,0 +1,163 @@
+# async_crud.py
+# Async equivalents of the crud functions behind the API handlers, with the same
+# side effects (cache invalidation, change counter). Queries are shared with crud.
+from typing import Dict, List, Optional, Tuple
+from sqlmodel import select, func
+from models import Task, BlackoutPeriod, PrintJob, TableVersion
+from database import async_session_scope
+from crud import (
+    _SCHEDULER_FIELDS, _version_bump, _versions_query, _filter_tasks, _keyset_query, _page_rows,
+    _task_page_query, _blackout_page_query,
+)
+import occurrences
+import rrules
+import blackouts
+import events
+
+async def _bump_version(s, name: str):
+    """Advance a table's change counter as part of the caller's transaction."""
+    if not (await s.exec(_version_bump(name))).rowcount:
+        s.add(TableVersion(name=name, version=1))
+
+async def get_table_versions(*names: str) -> Tuple[int, ...]:
+    async with async_session_scope() as s:
+        versions = dict((await s.exec(_versions_query(names))).all())
+    return tuple(versions.get(name, 0) for name in names)
+
+async def create_task(task: Task) -> Task:
+    async with async_session_scope() as s:
+        s.add(task)
+        await _bump_version(s, "task")
+        await s.commit()
+        await s.refresh(task)
+        events.publish("task.created", {"task": task.model_dump(mode="json")})
+        return task
+
+async def list_tasks(search: Optional[str] = None, category: Optional[str] = None, active: Optional[bool] = None) -> List[Task]:
+    async with async_session_scope() as s:
+        query, rank = _filter_tasks(select(Task), search, category, active)
+        if rank is not None:
+            query = query.order_by(rank)
+        return list((await s.exec(query)).all())
+
+async def page_tasks(search: Optional[str] = None, category: Optional[str] = None, active: Optional[bool] = None, *,
+                     limit: Optional[int] = None, after: Optional[list] = None, sort: str = "id",
+                     fields: Optional[List[str]] = None) -> Tuple[list, Optional[tuple]]:
+    query, keys = _task_page_query(search, category, active, sort, fields)
+    async with async_session_scope() as s:
+        rows = (await s.exec(_keyset_query(query, keys, limit, after))).all()
+    return _page_rows(rows, keys, limit, fields)
+
+async def get_task(task_id: int) -> Optional[Task]:
+    async with async_session_scope() as s:
+        return await s.get(Task, task_id)
+
+async def update_task(task_id: int, **data) -> Optional[Task]:
+    async with async_session_scope() as s:
+        obj = await s.get(Task, task_id)
+        if not obj:
+            return None
+        old_rule = (obj.rrule, obj.start_at, obj.until)
+        for k, v in data.items():
+            setattr(obj, k, v)
+        s.add(obj)
+        if set(data) - _SCHEDULER_FIELDS:
+            await _bump_version(s, "task")
+        if set(data) & _SCHEDULER_FIELDS:
+            await _bump_version(s, "task_schedule")
+        await s.commit()
+        await s.refresh(obj)
+        rule_changed = old_rule != (obj.rrule, obj.start_at, obj.until)
+        if rule_changed:
+            rrules.evict(*old_rule)
+        # Fires only move next_run_at/last_fired_at; the cached calendar windows stay valid
+        if rule_changed or set(data) - _SCHEDULER_FIELDS:
+            occurrences.invalidate_task(task_id)
+        if set(data) - _SCHEDULER_FIELDS:
+            events.publish("task.updated", {"task": obj.model_dump(mode="json")})
+        return obj
+
+async def delete_task(task_id: int) -> bool:
+    async with async_session_scope() as s:
+        obj = await s.get(Task, task_id)
+        if not obj:
+            return False
+        rrules.evict(obj.rrule, obj.start_at, obj.until)
+        await s.delete(obj)
+        await _bump_version(s, "task")
+        await s.commit()
+        occurrences.invalidate_task(task_id)
+        events.publish("task.deleted", {"id": task_id})
+        return True
+
+async def create_blackout_period(blackout: BlackoutPeriod) -> BlackoutPeriod:
+    async with async_session_scope() as s:
+        s.add(blackout)
+        await _bump_version(s, "blackoutperiod")
+        await s.commit()
+        await s.refresh(blackout)
+        blackouts.invalidate()
+        events.publish("blackout.created", {"blackout": blackout.model_dump(mode="json")})
+        return blackout
+
+async def list_blackout_periods() -> List[BlackoutPeriod]:
+    async with async_session_scope() as s:
+        return list((await s.exec(select(BlackoutPeriod))).all())
+
+async def page_blackout_periods(active: Optional[bool] = None, *, limit: Optional[int] = None, after: Optional[list] = None,
+                                sort: str = "id", fields: Optional[List[str]] = None) -> Tuple[list, Optional[tuple]]:
+    query, keys = _blackout_page_query(active, sort, fields)
+    async with async_session_scope() as s:
+        rows = (await s.exec(_keyset_query(query, keys, limit, after))).all()
+    return _page_rows(rows, keys, limit, fields)
+
+async def get_blackout_period(blackout_id: int) -> Optional[BlackoutPeriod]:
+    async with async_session_scope() as s:
+        return await s.get(BlackoutPeriod, blackout_id)
+
+async def update_blackout_period(blackout_id: int, **data) -> Optional[BlackoutPeriod]:
+    async with async_session_scope() as s:
+        obj = await s.get(BlackoutPeriod, blackout_id)
+        if not obj:
+            return None
+        for k, v in data.items():
+            setattr(obj, k, v)
+        s.add(obj)
+        await _bump_version(s, "blackoutperiod")
+        await s.commit()
+        await s.refresh(obj)
+        blackouts.invalidate()
+        events.publish("blackout.updated", {"blackout": obj.model_dump(mode="json")})
+        return obj
+
+async def delete_blackout_period(blackout_id: int) -> bool:
+    async with async_session_scope() as s:
+        obj = await s.get(BlackoutPeriod, blackout_id)
+        if not obj:
+            return False
+        await s.delete(obj)
+        await _bump_version(s, "blackoutperiod")
+        await s.commit()
+        blackouts.invalidate()
+        events.publish("blackout.deleted", {"id": blackout_id})
+        return True
+
+async def create_print_job(job: PrintJob) -> PrintJob:
+    async with async_session_scope() as s:
+        s.add(job)
+        await s.commit()
+        await s.refresh(job)
+        return job
+
+async def get_print_job(job_id: int) -> Optional[PrintJob]:
+    async with async_session_scope() as s:
+        return await s.get(PrintJob, job_id)
+
+async def count_pending_print_jobs_by_printer() -> Dict[str, int]:
+    async with async_session_scope() as s:
+        rows = (await s.exec(
+            select(PrintJob.printer, func.count())
+            .where(PrintJob.status.in_(("queued", "printing")))
+            .group_by(PrintJob.printer)
+        )).all()
+        return {printer: count for printer, count in rows}
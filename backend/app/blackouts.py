@@ -0,0 +1,102 @@
+# blackouts.py
+import threading
+from bisect import bisect_right
+from datetime import datetime
+from typing import List, Tuple
+from sqlmodel import select
+from models import BlackoutPeriod, TableVersion
+from database import session_scope
+from utils import to_aware
+
+Interval = Tuple[datetime, datetime]
+
+
+def _load_active_periods() -> List[Interval]:
+    with session_scope() as s:
+        rows = s.exec(select(BlackoutPeriod).where(BlackoutPeriod.is_active == True)).all()
+        return [(to_aware(b.start_date), to_aware(b.end_date)) for b in rows]
+
+
+def _load_version() -> int:
+    with session_scope() as s:
+        obj = s.get(TableVersion, "blackoutperiod")
+        return obj.version if obj else 0
+
+
+class BlackoutIndex:
+    """
+    Sorted, merged interval index over the active blackout periods.
+    Overlapping periods are merged so the intervals are disjoint and a point or
+    range lookup is a single bisect. The index is rebuilt lazily, and only after
+    invalidate() has been called by the blackout CRUD functions.
+    """
+
+    def __init__(self, loader=_load_active_periods, version_loader=_load_version):
+        self._loader = loader
+        self._version_loader = version_loader
+        # Last seen blackoutperiod change counter in the database (see sync())
+        self._db_version = None
+        # (starts, ends) swapped in as one tuple so readers never see a half-built index
+        self._intervals: Tuple[List[datetime], List[datetime]] = ([], [])
+        self._version = 0
+        self._built_version = -1
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        with self._lock:
+            self._version += 1
+
+    def sync(self):
+        """Invalidate if the blackout table changed in the database, e.g. through another worker."""
+        version = self._version_loader()
+        if version != self._db_version:
+            self._db_version = version
+            self.invalidate()
+
+    def _ensure(self):
+        if self._built_version == self._version:
+            return
+        with self._lock:
+            version = self._version
+            if self._built_version == version:
+                return
+            starts, ends = [], []
+            for start, end in sorted(self._loader()):
+                if end < start:
+                    continue
+                if ends and start <= ends[-1]:
+                    ends[-1] = max(ends[-1], end)
+                else:
+                    starts.append(start)
+                    ends.append(end)
+            self._intervals = (starts, ends)
+            self._built_version = version
+
+    def contains(self, dt: datetime) -> bool:
+        """True if `dt` falls within any active blackout period (inclusive)."""
+        self._ensure()
+        starts, ends = self._intervals
+        i = bisect_right(starts, dt) - 1
+        return i >= 0 and dt <= ends[i]
+
+    def overlaps(self, start: datetime, end: datetime) -> bool:
+        """True if any active blackout period intersects [start, end]."""
+        self._ensure()
+        starts, ends = self._intervals
+        i = bisect_right(starts, end) - 1
+        return i >= 0 and ends[i] >= start
+
+
+index = BlackoutIndex()
+
+
+def is_blacked_out(dt: datetime) -> bool:
+    return index.contains(to_aware(dt))
+
+
+def sync():
+    index.sync()
+
+
+def invalidate():
+    index.invalidate()
@@ -1,36 +1,304 @@
 # crud.py
-from typing import List, Optional
-from sqlmodel import select, or_
-from models import Task, BlackoutPeriod
+import re
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from sqlalchemy import select as select_rows, bindparam, insert, table, column, text, literal, literal_column, tuple_
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import select, or_, update, delete, func
+from models import Task, BlackoutPeriod, PrintJob, TableVersion, Lease, FireLog, FireLogDaily
 from database import session_scope
+import database
+import occurrences
+import rrules
+import blackouts
+import events
+
+# Columns the scheduler rewrites on every fire; changing only these is not a content change
+# and bumps "task_schedule" instead of "task" (exports ignore it, API reads don't)
+_SCHEDULER_FIELDS = {"last_fired_at", "next_run_at"}
+
+def _version_bump(name: str):
+    return update(TableVersion).where(TableVersion.name == name).values(version=TableVersion.version + 1)
+
+def _bump_version(s, name: str):
+    """Advance a table's change counter as part of the caller's transaction."""
+    if not s.exec(_version_bump(name)).rowcount:
+        s.add(TableVersion(name=name, version=1))
+
+def get_table_version(name: str) -> int:
+    with session_scope() as s:
+        obj = s.get(TableVersion, name)
+        return obj.version if obj else 0
+
+def _versions_query(names: Tuple[str, ...]):
+    return select(TableVersion.name, TableVersion.version).where(TableVersion.name.in_(names))
+
+def get_table_versions(*names: str) -> Tuple[int, ...]:
+    """Change counters for several tables in one query, in the order asked."""
+    with session_scope() as s:
+        versions = dict(s.exec(_versions_query(names)).all())
+    return tuple(versions.get(name, 0) for name in names)
+
+def acquire_lease(name: str, holder: str, ttl_seconds: float, now: float) -> bool:
+    """Take or renew a lease; succeeds for its current holder or once it has lapsed."""
+    with session_scope() as s:
+        taken = s.exec(
+            update(Lease)
+            .where(Lease.name == name, or_(Lease.holder == holder, Lease.expires_at < now))
+            .values(holder=holder, expires_at=now + ttl_seconds)
+        ).rowcount
+        if not taken:
+            if s.get(Lease, name) is not None:
+                return False
+            s.add(Lease(name=name, holder=holder, expires_at=now + ttl_seconds))
+        try:
+            s.commit()
+        except IntegrityError:
+            # Another process created the row first
+            return False
+        return True
+
+def release_lease(name: str, holder: str):
+    with session_scope() as s:
+        s.exec(update(Lease).where(Lease.name == name, Lease.holder == holder).values(expires_at=0))
+        s.commit()
+
+def get_lease(name: str) -> Optional[Lease]:
+    with session_scope() as s:
+        return s.get(Lease, name)
 
 def create_task(task: Task) -> Task:
     with session_scope() as s:
         s.add(task)
+        _bump_version(s, "task")
         s.commit()
         s.refresh(task)
+        events.publish("task.created", {"task": task.model_dump(mode="json")})
         return task
 
-def list_tasks(search: Optional[str] = None, category: Optional[str] = None) -> List[Task]:
-    with session_scope() as s:
-        query = select(Task)
-        
-        # Add search filter
-        if search:
-            search_term = f"%{search}%"
-            query = query.where(
-                or_(
-                    Task.title.ilike(search_term),
-                    Task.description.ilike(search_term)
-                )
+def bulk_create_tasks(tasks: List[Task]) -> List[int]:
+    """Insert many tasks with one executemany in a single transaction; returns their ids in order."""
+    if not tasks:
+        return []
+    params = [t.model_dump(exclude={"id"}) for t in tasks]
+    stmt = insert(Task).returning(Task.id, sort_by_parameter_order=True)
+    with session_scope() as s:
+        ids = list(s.connection().execute(stmt, params).scalars())
+        _bump_version(s, "task")
+        s.commit()
+    events.publish("tasks.created", {"count": len(ids), "first_id": ids[0], "last_id": ids[-1]})
+    return ids
+
+_task_fts = table("task_fts", column("rowid"))
+_task_trigram = table("task_trigram", column("rowid"))
+
+def _fts_query(search: str) -> str:
+    """Turn free text into an FTS5 query matching every word as a prefix."""
+    return " ".join(f'"{word}"*' for word in re.findall(r"\w+", search))
+
+def _trigram_query(search: str) -> Optional[str]:
+    """Turn free text into a trigram query matching every word as a substring, if all are long enough to."""
+    words = re.findall(r"\w+", search)
+    if not words or any(len(word) < 3 for word in words):
+        return None
+    return " ".join(f'"{word}"' for word in words)
+
+def _filter_tasks(query, search: Optional[str], category: Optional[str], active: Optional[bool]):
+    """Apply the task list filters; returns (query, rank), rank being the bm25 score when full-text matching."""
+    rank = None
+    # Add search filter
+    match = _fts_query(search) if search and database.FTS_ENABLED else None
+    if match:
+        # Every word as a prefix; lower bm25 is a better match (title hits weigh more)
+        scores = (
+            select_rows(_task_fts.c.rowid, literal_column("bm25(task_fts, 10.0, 1.0)").label("score"))
+            .where(text("task_fts MATCH :match").bindparams(match=match))
+            .subquery()
+        )
+        rank = func.coalesce(scores.c.score, 0.0)
+        substrings = _trigram_query(search) if database.FTS_TRIGRAM else None
+        if substrings:
+            # Or every word inside a longer one ("zuig" in "Stofzuigen"), ranked after the word matches
+            hits = select_rows(scores.c.rowid).union(
+                select_rows(_task_trigram.c.rowid)
+                .where(text("task_trigram MATCH :substrings").bindparams(substrings=substrings))
             )
-        
-        # Add category filter
-        if category and category != "all":
-            query = query.where(Task.category == category)
-            
+            query = query.outerjoin(scores, scores.c.rowid == Task.id).where(Task.id.in_(hits))
+        else:
+            query = query.join(scores, scores.c.rowid == Task.id)
+    elif search:
+        search_term = f"%{search}%"
+        query = query.where(
+            or_(
+                Task.title.ilike(search_term),
+                Task.description.ilike(search_term)
+            )
+        )
+
+    # Add category filter
+    if category and category != "all":
+        query = query.where(Task.category == category)
+
+    if active is not None:
+        query = query.where(Task.is_active == active)
+    return query, rank
+
+def list_tasks(search: Optional[str] = None, category: Optional[str] = None, active: Optional[bool] = None) -> List[Task]:
+    with session_scope() as s:
+        query, rank = _filter_tasks(select(Task), search, category, active)
+        if rank is not None:
+            query = query.order_by(rank)
         return list(s.exec(query).all())
 
+def _keyset_query(query, keys: list, limit: Optional[int], after: Optional[list]):
+    """
+    `query` in `keys` order, starting after the key `after`. Seeking on the sort key
+    instead of OFFSET lets the index jump straight to the page, so page N costs the
+    same as page 1. One extra row is fetched to tell whether another page follows.
+    """
+    query = query.add_columns(*(k.label(f"_key{i}") for i, k in enumerate(keys)))
+    if after is not None:
+        if len(after) != len(keys):
+            raise ValueError("Cursor does not match the sort order")
+        query = query.where(tuple_(*keys) > tuple_(*(literal(v, k.type) for v, k in zip(after, keys))))
+    query = query.order_by(*keys)
+    if limit is not None:
+        query = query.limit(limit + 1)
+    return query
+
+def _page_rows(rows: list, keys: list, limit: Optional[int], fields: Optional[List[str]]) -> Tuple[list, Optional[tuple]]:
+    """Split _keyset_query() rows into items (model objects, or dicts of `fields`) and the key to continue after."""
+    next_key = tuple(rows[limit - 1][-len(keys):]) if limit is not None and len(rows) > limit else None
+    if fields:
+        items = [dict(zip(fields, row)) for row in rows[:limit]]
+    else:
+        items = [row[0] for row in rows[:limit]]
+    return items, next_key
+
+def _task_page_query(search: Optional[str], category: Optional[str], active: Optional[bool],
+                     sort: str, fields: Optional[List[str]]) -> Tuple[object, list]:
+    # sqlalchemy's select, so rows come back as tuples with the sort key attached
+    columns = [getattr(Task, f) for f in fields] if fields else [Task]
+    query, rank = _filter_tasks(select_rows(*columns), search, category, active)
+    if sort == "rank" and rank is None:
+        sort = "id"
+    keys = {"id": [Task.id], "start_at": [Task.start_at, Task.id], "rank": [rank, Task.id]}[sort]
+    return query, keys
+
+def _blackout_page_query(active: Optional[bool], sort: str, fields: Optional[List[str]]) -> Tuple[object, list]:
+    columns = [getattr(BlackoutPeriod, f) for f in fields] if fields else [BlackoutPeriod]
+    query = select_rows(*columns)
+    if active is not None:
+        query = query.where(BlackoutPeriod.is_active == active)
+    keys = {"id": [BlackoutPeriod.id], "start_date": [BlackoutPeriod.start_date, BlackoutPeriod.id]}[sort]
+    return query, keys
+
+def page_tasks(search: Optional[str] = None, category: Optional[str] = None, active: Optional[bool] = None, *,
+               limit: Optional[int] = None, after: Optional[list] = None, sort: str = "id",
+               fields: Optional[List[str]] = None) -> Tuple[list, Optional[tuple]]:
+    """
+    Keyset-paginated list_tasks. `sort` is "id", "start_at" or "rank" (search relevance,
+    falls back to id without a full-text match). Served by ix_task_category_id and
+    ix_task_is_active_start_at. With `fields`, only those columns are loaded.
+    """
+    query, keys = _task_page_query(search, category, active, sort, fields)
+    with session_scope() as s:
+        rows = s.exec(_keyset_query(query, keys, limit, after)).all()
+    return _page_rows(rows, keys, limit, fields)
+
+def iter_active_schedules(batch_size: int = 5000, stale_before: Optional[datetime] = None) -> Iterator[list]:
+    """
+    Yield the scheduling columns (id, start_at, until, rrule, last_fired_at, next_run_at)
+    of active tasks in id order, one short-lived session per batch (keyset paging). Rows
+    are plain tuples with attribute access, far cheaper to load than full Task objects.
+    Pass `stale_before` to only get tasks whose next_run_at is missing or older than it.
+    """
+    last_id = 0
+    while True:
+        with session_scope() as s:
+            query = select(Task.id, Task.start_at, Task.until, Task.rrule, Task.last_fired_at, Task.next_run_at)
+            if stale_before is not None:
+                query = query.where(or_(Task.next_run_at == None, Task.next_run_at < stale_before))
+            batch = list(s.exec(
+                query
+                .where(Task.is_active == True, Task.id > last_id)
+                .order_by(Task.id)
+                .limit(batch_size)
+            ).all())
+        if not batch:
+            return
+        yield batch
+        last_id = batch[-1].id
+
+def iter_tasks(batch_size: int = 1000) -> Iterator[List[Task]]:
+    """Yield all tasks in id order, one short-lived session per batch (keyset paging)."""
+    last_id = 0
+    while True:
+        with session_scope() as s:
+            batch = list(s.exec(select(Task).where(Task.id > last_id).order_by(Task.id).limit(batch_size)).all())
+        if not batch:
+            return
+        yield batch
+        last_id = batch[-1].id
+
+def _runs_event(params: List[dict]) -> dict:
+    # Spell out small batches; a rehydration of thousands of tasks is just a count
+    if len(params) > 100:
+        return {"count": len(params)}
+    return {"count": len(params), "tasks": [{"id": p["task_id"], "next_run_at": p["next_run_at"]} for p in params]}
+
+def set_next_runs(next_runs: Iterable[Tuple[int, Optional[datetime]]]):
+    """Bulk-write next_run_at for many tasks in a single transaction."""
+    params = [{"task_id": task_id, "next_run_at": next_run} for task_id, next_run in next_runs]
+    if not params:
+        return
+    stmt = (
+        update(Task)
+        .where(Task.id == bindparam("task_id"))
+        .values(next_run_at=bindparam("next_run_at"))
+        .execution_options(synchronize_session=False)
+    )
+    with session_scope() as s:
+        s.connection().execute(stmt, params)
+        _bump_version(s, "task_schedule")
+        s.commit()
+    events.publish("tasks.rescheduled", _runs_event(params))
+
+def mark_fired(fired_at: datetime, next_runs: Iterable[Tuple[int, Optional[datetime]]]):
+    """Record a batch of fires: last_fired_at and each task's next_run_at, one executemany."""
+    params = [{"task_id": task_id, "next_run_at": next_run} for task_id, next_run in next_runs]
+    if not params:
+        return
+    stmt = (
+        update(Task)
+        .where(Task.id == bindparam("task_id"))
+        .values(last_fired_at=fired_at, next_run_at=bindparam("next_run_at"))
+        .execution_options(synchronize_session=False)
+    )
+    with session_scope() as s:
+        s.connection().execute(stmt, params)
+        _bump_version(s, "task_schedule")
+        s.commit()
+
+def list_due_tasks(now: datetime, limit: int = 500) -> List[Task]:
+    """Active tasks whose next_run_at has passed, oldest first (served by ix_task_next_run_at)."""
+    with session_scope() as s:
+        return list(s.exec(
+            select(Task)
+            .where(Task.is_active == True, Task.next_run_at != None, Task.next_run_at <= now)
+            .order_by(Task.next_run_at)
+            .limit(limit)
+        ).all())
+
+def count_scheduled_tasks() -> int:
+    """Active tasks with an upcoming run (what the poller will fire)."""
+    with session_scope() as s:
+        return s.exec(select(func.count()).select_from(Task).where(Task.is_active == True, Task.next_run_at != None)).one()
+
+def get_tasks(task_ids: List[int]) -> List[Task]:
+    with session_scope() as s:
+        return list(s.exec(select(Task).where(Task.id.in_(task_ids))).all())
+
 def get_task(task_id: int) -> Optional[Task]:
     with session_scope() as s:
         return s.get(Task, task_id)
@@ -40,11 +308,25 @@ def update_task(task_id: int, **data) -> Optional[Task]:
         obj = s.get(Task, task_id)
         if not obj:
             return None
+        old_rule = (obj.rrule, obj.start_at, obj.until)
         for k, v in data.items():
             setattr(obj, k, v)
         s.add(obj)
+        if set(data) - _SCHEDULER_FIELDS:
+            _bump_version(s, "task")
+        if set(data) & _SCHEDULER_FIELDS:
+            _bump_version(s, "task_schedule")
         s.commit()
         s.refresh(obj)
+        rule_changed = old_rule != (obj.rrule, obj.start_at, obj.until)
+        if rule_changed:
+            rrules.evict(*old_rule)
+        # Fires only move next_run_at/last_fired_at; the cached calendar windows stay valid
+        if rule_changed or set(data) - _SCHEDULER_FIELDS:
+            occurrences.invalidate_task(task_id)
+        if set(data) - _SCHEDULER_FIELDS:
+            # Fires are announced by the scheduler as task.fired
+            events.publish("task.updated", {"task": obj.model_dump(mode="json")})
         return obj
 
 def delete_task(task_id: int) -> bool:
@@ -52,21 +334,36 @@ def delete_task(task_id: int) -> bool:
         obj = s.get(Task, task_id)
         if not obj:
             return False
+        rrules.evict(obj.rrule, obj.start_at, obj.until)
         s.delete(obj)
+        _bump_version(s, "task")
         s.commit()
+        occurrences.invalidate_task(task_id)
+        events.publish("task.deleted", {"id": task_id})
         return True
 
 def create_blackout_period(blackout: BlackoutPeriod) -> BlackoutPeriod:
     with session_scope() as s:
         s.add(blackout)
+        _bump_version(s, "blackoutperiod")
         s.commit()
         s.refresh(blackout)
+        blackouts.invalidate()
+        events.publish("blackout.created", {"blackout": blackout.model_dump(mode="json")})
         return blackout
 
 def list_blackout_periods() -> List[BlackoutPeriod]:
     with session_scope() as s:
         return list(s.exec(select(BlackoutPeriod)).all())
 
+def page_blackout_periods(active: Optional[bool] = None, *, limit: Optional[int] = None, after: Optional[list] = None,
+                          sort: str = "id", fields: Optional[List[str]] = None) -> Tuple[list, Optional[tuple]]:
+    """Keyset-paginated blackout periods, by "id" or "start_date" (served by ix_blackoutperiod_is_active_start_date)."""
+    query, keys = _blackout_page_query(active, sort, fields)
+    with session_scope() as s:
+        rows = s.exec(_keyset_query(query, keys, limit, after)).all()
+    return _page_rows(rows, keys, limit, fields)
+
 def get_blackout_period(blackout_id: int) -> Optional[BlackoutPeriod]:
     with session_scope() as s:
         return s.get(BlackoutPeriod, blackout_id)
@@ -79,8 +376,11 @@ def update_blackout_period(blackout_id: int, **data) -> Optional[BlackoutPeriod]
         for k, v in data.items():
             setattr(obj, k, v)
         s.add(obj)
+        _bump_version(s, "blackoutperiod")
         s.commit()
         s.refresh(obj)
+        blackouts.invalidate()
+        events.publish("blackout.updated", {"blackout": obj.model_dump(mode="json")})
         return obj
 
 def delete_blackout_period(blackout_id: int) -> bool:
@@ -89,5 +389,183 @@ def delete_blackout_period(blackout_id: int) -> bool:
         if not obj:
             return False
         s.delete(obj)
+        _bump_version(s, "blackoutperiod")
         s.commit()
+        blackouts.invalidate()
+        events.publish("blackout.deleted", {"id": blackout_id})
         return True
+
+def create_print_job(job: PrintJob) -> PrintJob:
+    with session_scope() as s:
+        s.add(job)
+        s.commit()
+        s.refresh(job)
+        return job
+
+def create_print_jobs(jobs: List[PrintJob]) -> int:
+    """Queue several jobs in one transaction."""
+    with session_scope() as s:
+        s.add_all(jobs)
+        s.commit()
+        return len(jobs)
+
+def get_print_job(job_id: int) -> Optional[PrintJob]:
+    with session_scope() as s:
+        return s.get(PrintJob, job_id)
+
+def update_print_job(job_id: int, **data) -> Optional[PrintJob]:
+    with session_scope() as s:
+        obj = s.get(PrintJob, job_id)
+        if not obj:
+            return None
+        for k, v in data.items():
+            setattr(obj, k, v)
+        s.add(obj)
+        s.commit()
+        s.refresh(obj)
+        return obj
+
+def count_pending_print_jobs() -> int:
+    with session_scope() as s:
+        return s.exec(
+            select(func.count()).select_from(PrintJob).where(PrintJob.status.in_(("queued", "printing")))
+        ).one()
+
+def count_pending_print_jobs_by_printer() -> Dict[str, int]:
+    with session_scope() as s:
+        rows = s.exec(
+            select(PrintJob.printer, func.count())
+            .where(PrintJob.status.in_(("queued", "printing")))
+            .group_by(PrintJob.printer)
+        ).all()
+        return {printer: count for printer, count in rows}
+
+def claim_next_print_job(now: datetime, printer: str) -> Optional[PrintJob]:
+    """Mark the printer's oldest due queued job as printing and return it."""
+    with session_scope() as s:
+        obj = s.exec(
+            select(PrintJob)
+            .where(PrintJob.printer == printer, PrintJob.status == "queued", PrintJob.next_attempt_at <= now)
+            .order_by(PrintJob.id)
+            .limit(1)
+        ).first()
+        if not obj:
+            return None
+        obj.status = "printing"
+        obj.attempts += 1
+        s.add(obj)
+        s.commit()
+        s.refresh(obj)
+        return obj
+
+def next_print_attempt_at(printer: str) -> Optional[datetime]:
+    with session_scope() as s:
+        return s.exec(
+            select(func.min(PrintJob.next_attempt_at))
+            .where(PrintJob.printer == printer, PrintJob.status == "queued")
+        ).one()
+
+def list_unrouted_print_jobs(printers: List[str]) -> List[PrintJob]:
+    """Queued jobs assigned to a printer that is no longer configured."""
+    with session_scope() as s:
+        return s.exec(
+            select(PrintJob).where(PrintJob.status == "queued", PrintJob.printer.not_in(printers))
+        ).all()
+
+def requeue_interrupted_print_jobs() -> int:
+    """Jobs left 'printing' by a crash or restart go back to the queue."""
+    with session_scope() as s:
+        result = s.exec(update(PrintJob).where(PrintJob.status == "printing").values(status="queued"))
+        s.commit()
+        return result.rowcount
+
+def delete_finished_print_jobs(before: datetime) -> int:
+    with session_scope() as s:
+        result = s.exec(
+            delete(PrintJob).where(PrintJob.status.in_(("done", "failed")), PrintJob.finished_at < before)
+        )
+        s.commit()
+        return result.rowcount
+
+def add_fire_log(rows: List[dict]) -> int:
+    """Append fire log rows (FireLog column dicts) with one executemany."""
+    if not rows:
+        return 0
+    with session_scope() as s:
+        s.connection().execute(insert(FireLog), rows)
+        s.commit()
+    return len(rows)
+
+def _fire_log_query(query, start: datetime, end: datetime, task_id: Optional[int]):
+    query = query.where(FireLog.fired_at >= start, FireLog.fired_at < end)
+    if task_id is not None:
+        query = query.where(FireLog.task_id == task_id)
+    return query
+
+def page_fire_log(start: datetime, end: datetime, task_id: Optional[int] = None, outcome: Optional[str] = None, *,
+                  limit: Optional[int] = None, after: Optional[list] = None) -> Tuple[list, Optional[tuple]]:
+    """Fire log rows in [start, end) in fired_at order, keyset-paginated (served by ix_fire_log_fired_at)."""
+    query = _fire_log_query(select_rows(FireLog), start, end, task_id)
+    if outcome:
+        query = query.where(FireLog.outcome == outcome)
+    keys = [FireLog.fired_at, FireLog.id]
+    with session_scope() as s:
+        rows = s.exec(_keyset_query(query, keys, limit, after)).all()
+    return _page_rows(rows, keys, limit, None)
+
+def summarize_fire_log(start: datetime, end: datetime, task_id: Optional[int] = None) -> List[dict]:
+    """
+    Fire counts and print durations per day and outcome over [start, end), from the
+    fire log and its daily rollups; compacted days count in full.
+    """
+    day = func.date(FireLog.fired_at)
+    raw = _fire_log_query(
+        select_rows(day, FireLog.outcome, func.count(), func.sum(FireLog.duration_ms), func.max(FireLog.duration_ms)),
+        start, end, task_id,
+    ).group_by(day, FireLog.outcome)
+    rolled = select_rows(
+        FireLogDaily.day, FireLogDaily.outcome, func.sum(FireLogDaily.count),
+        func.sum(FireLogDaily.duration_ms_total), func.max(FireLogDaily.duration_ms_max),
+    ).where(FireLogDaily.day >= start.date(), FireLogDaily.day <= end.date())
+    if task_id is not None:
+        rolled = rolled.where(FireLogDaily.task_id == task_id)
+    rolled = rolled.group_by(FireLogDaily.day, FireLogDaily.outcome)
+
+    totals: Dict[Tuple[str, str], list] = {}
+    with session_scope() as s:
+        for d, outcome, count, duration_total, duration_max in [*s.exec(raw).all(), *s.exec(rolled).all()]:
+            entry = totals.setdefault((str(d), outcome), [0, 0.0, None])
+            entry[0] += count
+            entry[1] += duration_total or 0.0
+            if duration_max is not None:
+                entry[2] = max(entry[2] or 0.0, duration_max)
+    return [
+        {
+            "day": d, "outcome": outcome, "count": count,
+            # Only printed/failed rows have a duration
+            "avg_duration_ms": round(duration_total / count, 1) if duration_max is not None else None,
+            "max_duration_ms": duration_max,
+        }
+        for (d, outcome), (count, duration_total, duration_max) in sorted(totals.items())
+    ]
+
+def compact_fire_log(before: datetime) -> int:
+    """
+    Fold fire log rows that fired before `before` into per day, task and outcome totals
+    in fire_log_daily and delete them, in one transaction. Returns the rows compacted.
+    """
+    day = func.date(FireLog.fired_at)
+    totals = (
+        select_rows(
+            day, FireLog.task_id, FireLog.outcome, func.count(),
+            func.coalesce(func.sum(FireLog.duration_ms), 0.0), func.max(FireLog.duration_ms),
+        )
+        .where(FireLog.fired_at < before)
+        .group_by(day, FireLog.task_id, FireLog.outcome)
+    )
+    columns = ["day", "task_id", "outcome", "count", "duration_ms_total", "duration_ms_max"]
+    with session_scope() as s:
+        s.connection().execute(insert(FireLogDaily).from_select(columns, totals))
+        result = s.exec(delete(FireLog).where(FireLog.fired_at < before))
+        s.commit()
+        return result.rowcount
@@ -1,8 +1,10 @@
 # database.py
 import os
 from pathlib import Path
-from contextlib import contextmanager
+from contextlib import contextmanager, asynccontextmanager
+from sqlalchemy import event
 from sqlmodel import SQLModel, Session, create_engine
+import metrics
 
 # --- DB path setup (writable) ---
 # Priority: DATABASE_URL > DB_PATH > DB_DIR/app.db > /app/data/app.db
@@ -18,8 +20,69 @@ db_dir.mkdir(parents=True, exist_ok=True)
 
 DATABASE_URL = os.getenv("DATABASE_URL", f"sqlite:///{db_path}")
 
-# SQLite + threads
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+# "default": stock SQLite settings; "production": WAL, busy timeout, relaxed fsync and a tuned pool
+DB_PROFILE = os.getenv("DB_PROFILE", "default").lower()
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "8"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "8"))
+
+def _sqlite_production_pragmas(dbapi_conn, _record):
+    cursor = dbapi_conn.cursor()
+    # WAL: readers never block the writer and vice versa; commits are appends, not journal rewrites
+    cursor.execute("PRAGMA journal_mode=WAL")
+    # Writers queue up for the lock instead of failing with "database is locked"
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    # In WAL mode NORMAL only fsyncs at checkpoints; still crash-safe, may lose the last commits on power loss
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
+
+def _create_engine():
+    is_sqlite = DATABASE_URL.startswith("sqlite")
+    # SQLite + threads
+    connect_args = {"check_same_thread": False} if is_sqlite else {}
+    if DB_PROFILE != "production":
+        return create_engine(DATABASE_URL, connect_args=connect_args)
+    if is_sqlite:
+        # Python's sqlite3 waits 5s by default; leave the waiting to busy_timeout
+        connect_args["timeout"] = SQLITE_BUSY_TIMEOUT_MS / 1000
+    new_engine = create_engine(
+        DATABASE_URL,
+        connect_args=connect_args,
+        # Enough connections for the API threadpool, the scheduler and the spooler workers
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=10,
+    )
+    if is_sqlite:
+        event.listen(new_engine, "connect", _sqlite_production_pragmas)
+    return new_engine
+
+engine = _create_engine()
+metrics.instrument_engine(engine)
+
+# Driver URL for the async API path; derived for SQLite, set it explicitly for other databases
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or DATABASE_URL.replace("sqlite://", "sqlite+aiosqlite://", 1)
+_async_engine = None
+
+def get_async_engine():
+    """Async engine (aiosqlite for SQLite), created on first use with the same profile as `engine`."""
+    global _async_engine
+    if _async_engine is None:
+        from sqlalchemy.ext.asyncio import create_async_engine
+
+        kwargs = {}
+        if DB_PROFILE == "production":
+            kwargs = {"pool_size": DB_POOL_SIZE, "max_overflow": DB_MAX_OVERFLOW, "pool_timeout": 10}
+            if ASYNC_DATABASE_URL.startswith("sqlite"):
+                from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+                # aiosqlite defaults to NullPool, which takes no pool arguments
+                kwargs["poolclass"] = AsyncAdaptedQueuePool
+        _async_engine = create_async_engine(ASYNC_DATABASE_URL, **kwargs)
+        if DB_PROFILE == "production" and ASYNC_DATABASE_URL.startswith("sqlite"):
+            event.listen(_async_engine.sync_engine, "connect", _sqlite_production_pragmas)
+        metrics.instrument_engine(_async_engine.sync_engine)
+    return _async_engine
 
 def init_db():
     SQLModel.metadata.create_all(engine)
@@ -47,21 +110,97 @@ def session_scope():
     with Session(engine) as session:
         yield session
 
+@asynccontextmanager
+async def async_session_scope():
+    """
+    Async counterpart of session_scope():
+        async with async_session_scope() as s:
+            ...
+    Objects stay loaded after commit, since lazy refreshes can't happen outside the session.
+    """
+    from sqlmodel.ext.asyncio.session import AsyncSession
+
+    async with AsyncSession(get_async_engine(), expire_on_commit=False) as session:
+        yield session
+
+def _add_column_if_missing(session, table: str, column: str, ddl: str):
+    from sqlalchemy import inspect, text
+
+    # Look the column up in the schema rather than probing with a SELECT that may fail
+    if column in {c["name"] for c in inspect(session.connection()).get_columns(table)}:
+        return
+    try:
+        session.exec(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+        session.commit()
+        print(f"✅ Added {column} column to {table} table")
+    except Exception as e:
+        print(f"Migration error: {e}")
+        session.rollback()
+
+# Set by migrate_db() once the task search indexes are in place (SQLite with FTS5 only):
+# task_fts matches words (and prefixes), task_trigram any substring of three characters or more
+FTS_ENABLED = False
+FTS_TRIGRAM = False
+
+_FTS_TRIGGERS = {
+    "ai": "AFTER INSERT ON task BEGIN "
+          "INSERT INTO {index}(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+    "ad": "AFTER DELETE ON task BEGIN "
+          "INSERT INTO {index}({index}, rowid, title, description) VALUES ('delete', old.id, old.title, old.description); END",
+    # Only text edits touch the index, not the scheduler's last_fired_at/next_run_at writes
+    "au": "AFTER UPDATE OF title, description ON task BEGIN "
+          "INSERT INTO {index}({index}, rowid, title, description) VALUES ('delete', old.id, old.title, old.description); "
+          "INSERT INTO {index}(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+}
+
+def _setup_fts(session, index: str, tokenize: str) -> bool:
+    """Create an external-content FTS5 index over task title/description plus its sync triggers."""
+    from sqlalchemy import text
+
+    if engine.dialect.name != "sqlite":
+        return False
+    try:
+        exists = session.exec(text(f"SELECT 1 FROM sqlite_master WHERE name = '{index}'")).first()
+        session.exec(text(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {index} USING fts5("
+            f"title, description, content='task', content_rowid='id', tokenize='{tokenize}')"
+        ))
+        for suffix, body in _FTS_TRIGGERS.items():
+            session.exec(text(f"CREATE TRIGGER IF NOT EXISTS {index}_{suffix} {body.format(index=index)}"))
+        if not exists:
+            # Index the rows that predate the triggers
+            session.exec(text(f"INSERT INTO {index}({index}) VALUES ('rebuild')"))
+            print(f"✅ Built {index} search index")
+        session.commit()
+        return True
+    except Exception as e:
+        # e.g. a SQLite build without FTS5 (or, for trigram, older than 3.34); search falls back to LIKE
+        print(f"Full-text search unavailable ({index}): {e}")
+        session.rollback()
+        return False
+
 def migrate_db():
     """Run database migrations"""
     from sqlalchemy import text
+    global FTS_ENABLED, FTS_TRIGRAM
     
     with Session(engine) as session:
-        # Check if category column exists in task table
-        try:
-            # Try to select category - if it fails, the column doesn't exist
-            session.exec(text("SELECT category FROM task LIMIT 1"))
-        except Exception:
-            # Add category column with default value
-            try:
-                session.exec(text("ALTER TABLE task ADD COLUMN category VARCHAR DEFAULT 'other'"))
-                session.commit()
-                print("✅ Added category column to task table")
-            except Exception as e:
-                print(f"Migration error: {e}")
-                session.rollback()
+        _add_column_if_missing(session, "task", "category", "VARCHAR DEFAULT 'other'")
+        _add_column_if_missing(session, "task", "next_run_at", "DATETIME")
+        session.exec(text("CREATE INDEX IF NOT EXISTS ix_task_next_run_at ON task (next_run_at)"))
+        _add_column_if_missing(session, "printjob", "printer", "VARCHAR DEFAULT 'default'")
+        session.exec(text("CREATE INDEX IF NOT EXISTS ix_printjob_printer ON printjob (printer)"))
+        _add_column_if_missing(session, "printjob", "planned_at", "DATETIME")
+        # Fire log history per task in time order
+        session.exec(text("CREATE INDEX IF NOT EXISTS ix_fire_log_task_id_fired_at ON fire_log (task_id, fired_at)"))
+        session.exec(text("CREATE INDEX IF NOT EXISTS ix_fire_log_daily_task_id_day ON fire_log_daily (task_id, day)"))
+        session.exec(text("CREATE INDEX IF NOT EXISTS ix_task_start_at ON task (start_at)"))
+        # Keyset pagination: category filter in id order, active filter in start order
+        session.exec(text("CREATE INDEX IF NOT EXISTS ix_task_category_id ON task (category, id)"))
+        session.exec(text("CREATE INDEX IF NOT EXISTS ix_task_is_active_start_at ON task (is_active, start_at)"))
+        session.exec(text(
+            "CREATE INDEX IF NOT EXISTS ix_blackoutperiod_is_active_start_date ON blackoutperiod (is_active, start_date)"
+        ))
+        session.commit()
+        FTS_ENABLED = _setup_fts(session, "task_fts", "unicode61 remove_diacritics 2")
+        FTS_TRIGRAM = FTS_ENABLED and _setup_fts(session, "task_trigram", "trigram")
@@ -0,0 +1,123 @@
+# duequeue.py
+import heapq
+import math
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+
+class DueQueue:
+    """
+    Min-heap of (run time, task id) drained by one thread. Run times are rounded up
+    to the next tick boundary, so everything due within the same tick is handed to
+    `fire_batch` as one list of task ids. Rescheduling or dropping a task just
+    records its new run time; outdated heap entries are skipped when they surface.
+    """
+
+    def __init__(self, fire_batch: Callable[[List[int]], None], tick_seconds: float = 1.0):
+        self._fire_batch = fire_batch
+        self.tick_seconds = tick_seconds
+        self._heap: List[Tuple[float, int]] = []
+        # task id -> its current run time (epoch seconds); anything else in the heap is stale
+        self._due: Dict[int, float] = {}
+        self._cond = threading.Condition()
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+
+    def push(self, task_id: int, run_at: Optional[datetime]):
+        """(Re)schedule a task; None unschedules it."""
+        with self._cond:
+            if run_at is None:
+                self._due.pop(task_id, None)
+                return
+            ts = run_at.timestamp()
+            self._due[task_id] = ts
+            heapq.heappush(self._heap, (ts, task_id))
+            self._cond.notify()
+
+    def push_many(self, planned: Iterable[Tuple[datetime, int]]):
+        """
+        Schedule many (run_at, task_id) pairs. A batch larger than the heap (e.g. on
+        rehydrate) goes in with one heapify; smaller ones are pushed one by one, which
+        costs O(k log n) instead of re-heapifying all n entries.
+        """
+        entries = [(run_at.timestamp(), task_id) for run_at, task_id in planned]
+        with self._cond:
+            for ts, task_id in entries:
+                self._due[task_id] = ts
+            if len(entries) > len(self._heap):
+                self._heap.extend(entries)
+                heapq.heapify(self._heap)
+            else:
+                for entry in entries:
+                    heapq.heappush(self._heap, entry)
+            self._cond.notify()
+
+    def discard(self, task_id: int):
+        with self._cond:
+            self._due.pop(task_id, None)
+
+    def scheduled_at(self, task_id: int) -> Optional[float]:
+        """The task's pending run time (epoch seconds), if it has one."""
+        return self._due.get(task_id)
+
+    def clear(self):
+        with self._cond:
+            self._due.clear()
+            self._heap.clear()
+
+    def __len__(self) -> int:
+        return len(self._due)
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="due-queue", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0):
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _drop_stale_head(self):
+        while self._heap and self._due.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+
+    def _next_batch(self) -> Optional[List[int]]:
+        """Block until the earliest tick is due, then pop every task in it; None once stopped."""
+        with self._cond:
+            while not self._stopping:
+                self._drop_stale_head()
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+                boundary = math.ceil(self._heap[0][0] / self.tick_seconds) * self.tick_seconds
+                delay = boundary - time.time()
+                if delay > 0:
+                    self._cond.wait(delay)
+                    continue
+                batch = []
+                while self._heap and self._heap[0][0] <= boundary:
+                    ts, task_id = heapq.heappop(self._heap)
+                    if self._due.get(task_id) == ts:
+                        del self._due[task_id]
+                        batch.append(task_id)
+                if batch:
+                    return batch
+            return None
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            try:
+                self._fire_batch(batch)
+            except Exception as e:
+                # Keep draining; the failed tasks keep their next_run_at and are re-read on restart
+                print(f"Due queue error firing {len(batch)} task(s): {e}")
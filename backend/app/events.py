@@ -0,0 +1,118 @@
+# events.py
+# In-process change feed behind GET /api/events (server-sent events).
+import asyncio
+import json
+import os
+import uuid
+from collections import deque
+from typing import AsyncIterator, Deque, Optional, Set
+
+# Frames a slow client may fall behind before it is told to resync instead
+EVENTS_CLIENT_BUFFER = int(os.getenv("EVENTS_CLIENT_BUFFER", "500"))
+# Recent frames kept for clients reconnecting with Last-Event-ID
+EVENTS_REPLAY_SIZE = int(os.getenv("EVENTS_REPLAY_SIZE", "1000"))
+EVENTS_HEARTBEAT_SECONDS = float(os.getenv("EVENTS_HEARTBEAT_SECONDS", "15"))
+
+_RESYNC = "event: resync\ndata: {}\n\n"
+
+
+def _encode(value):
+    # datetimes from the scheduler; everything else is already JSON-ready
+    return value.isoformat() if hasattr(value, "isoformat") else str(value)
+
+
+class _Subscriber:
+    __slots__ = ("frames", "ready")
+
+    def __init__(self):
+        self.frames: Deque[str] = deque()
+        self.ready = asyncio.Event()
+
+
+class EventBus:
+    """
+    Fan-out of change events to SSE clients. publish() may be called from any thread
+    (scheduler, spooler workers, request handlers); it only hands the event to the
+    event loop. There each event is encoded once and appended to every client's
+    buffer, so clients cost no DB queries and a slow one never blocks a publisher.
+    """
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._subscribers: Set[_Subscriber] = set()
+        self._recent: Deque[tuple] = deque(maxlen=EVENTS_REPLAY_SIZE)
+        self._last_id = 0
+        # Event ids are "<epoch>-<n>": ids from before a restart (or from another uvicorn
+        # worker) carry a different epoch, so a reconnecting client can be told to resync
+        self._epoch = uuid.uuid4().hex[:8]
+
+    def publish(self, event: str, data: dict):
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            loop.call_soon_threadsafe(self._dispatch, event, data)
+        except RuntimeError:
+            # Loop shut down between the check and the call
+            pass
+
+    def _dispatch(self, event: str, data: dict):
+        self._last_id += 1
+        frame = f"id: {self._epoch}-{self._last_id}\nevent: {event}\ndata: {json.dumps(data, default=_encode)}\n\n"
+        self._recent.append((self._last_id, frame))
+        for sub in self._subscribers:
+            if len(sub.frames) >= EVENTS_CLIENT_BUFFER:
+                # Too far behind: drop its backlog and have it refetch instead
+                sub.frames.clear()
+                sub.frames.append(_RESYNC)
+            else:
+                sub.frames.append(frame)
+            sub.ready.set()
+
+    def _replay(self, sub: _Subscriber, last_event_id: Optional[str]):
+        if not last_event_id:
+            return
+        epoch, _, number = last_event_id.partition("-")
+        last = int(number) if epoch == self._epoch and number.isdigit() else None
+        if last == self._last_id:
+            return
+        if last is None or last > self._last_id or not self._recent or self._recent[0][0] > last + 1:
+            # An id from before a restart (or from another worker), or the missed events are gone
+            sub.frames.append(_RESYNC)
+        else:
+            sub.frames.extend(frame for event_id, frame in self._recent if event_id > last)
+        sub.ready.set()
+
+    async def stream(self, last_event_id: Optional[str] = None) -> AsyncIterator[str]:
+        """SSE frames for one client until it disconnects, with heartbeats in between."""
+        # Events are dispatched on the server's loop, taken from the first client; until
+        # someone listens publish() is a no-op
+        self._loop = asyncio.get_running_loop()
+        sub = _Subscriber()
+        self._subscribers.add(sub)
+        try:
+            # Reconnect delay hint for EventSource, in milliseconds
+            yield "retry: 3000\n\n"
+            self._replay(sub, last_event_id)
+            while True:
+                try:
+                    await asyncio.wait_for(sub.ready.wait(), EVENTS_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                sub.ready.clear()
+                frames = "".join(sub.frames)
+                sub.frames.clear()
+                yield frames
+        finally:
+            self._subscribers.discard(sub)
+
+    def stats(self) -> dict:
+        return {"clients": len(self._subscribers), "last_event_id": f"{self._epoch}-{self._last_id}"}
+
+
+bus = EventBus()
+
+
+def publish(event: str, data: dict):
+    bus.publish(event, data)
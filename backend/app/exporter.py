@@ -0,0 +1,69 @@
+# exporter.py
+import json
+import os
+import zlib
+from typing import Iterable, Iterator
+from models import Task
+from crud import iter_tasks
+
+# Tasks read per DB round trip while streaming an export
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+MEDIA_TYPES = {"json": "application/json", "ndjson": "application/x-ndjson"}
+
+
+def _row(task: Task) -> dict:
+    return {
+        "title": task.title,
+        "description": task.description,
+        "start_at": task.start_at.isoformat(),
+        "until": task.until.isoformat() if task.until else None,
+        "rrule": task.rrule,
+        "auto_print": task.auto_print,
+        "is_active": task.is_active,
+        "category": task.category,
+    }
+
+
+def _iter_json(batch_size: int) -> Iterator[bytes]:
+    # Same document as the old in-memory export: {"tasks": [...]}
+    yield b'{"tasks": ['
+    separator = ""
+    for batch in iter_tasks(batch_size):
+        yield (separator + ", ".join(json.dumps(_row(t)) for t in batch)).encode()
+        separator = ", "
+    yield b"]}"
+
+
+def _iter_ndjson(batch_size: int) -> Iterator[bytes]:
+    # One task per line, the format /api/import streams back in
+    for batch in iter_tasks(batch_size):
+        yield "".join(json.dumps(_row(t)) + "\n" for t in batch).encode()
+
+
+def iter_export(fmt: str = "json", batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[bytes]:
+    """Encode all tasks chunk by chunk; only one batch of rows is in memory at a time."""
+    if fmt == "ndjson":
+        return _iter_ndjson(batch_size)
+    return _iter_json(batch_size)
+
+
+def gzipped(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """Gzip a byte stream incrementally."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_etag(version: int, fmt: str, gzip: bool) -> str:
+    """Strong ETag per representation; changes whenever the task change counter does."""
+    return f'"tasks-{version}-{fmt}{"-gzip" if gzip else ""}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    tags = [t.strip() for t in if_none_match.split(",")]
+    # Weak comparison, as RFC 9110 prescribes for If-None-Match
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
@@ -0,0 +1,122 @@
+# firelog.py
+# Buffered writer for the fire log (what happened to every fire and its receipt).
+import os
+import threading
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Deque, Optional
+from crud import add_fire_log, compact_fire_log
+from utils import now_tz, to_aware
+
+FIRE_LOG_FLUSH_SECONDS = float(os.getenv("FIRE_LOG_FLUSH_SECONDS", "2"))
+FIRE_LOG_BATCH_SIZE = int(os.getenv("FIRE_LOG_BATCH_SIZE", "500"))
+# Rows held while the database can't take them; beyond this the oldest are dropped
+FIRE_LOG_MAX_BUFFER = int(os.getenv("FIRE_LOG_MAX_BUFFER", "50000"))
+# Rows are kept this long, then compacted into per-day totals (fire_log_daily)
+FIRE_LOG_RETENTION_DAYS = int(os.getenv("FIRE_LOG_RETENTION_DAYS", "30"))
+
+
+class FireLogWriter:
+    """
+    The scheduler and spooler record() rows into an in-memory buffer; a background
+    thread inserts them in batches every FIRE_LOG_FLUSH_SECONDS (sooner once a batch
+    is full), so firing never waits on the fire log. The same thread compacts rows
+    older than the retention period into daily totals once an hour.
+    """
+
+    def __init__(self, flush_seconds: float = FIRE_LOG_FLUSH_SECONDS, batch_size: int = FIRE_LOG_BATCH_SIZE,
+                 max_buffer: int = FIRE_LOG_MAX_BUFFER, retention_days: int = FIRE_LOG_RETENTION_DAYS):
+        self.flush_seconds = flush_seconds
+        self.batch_size = batch_size
+        self.max_buffer = max_buffer
+        self.retention_days = retention_days
+        self.written = 0
+        self.dropped = 0
+        self._rows: Deque[dict] = deque()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last_compaction: Optional[datetime] = None
+
+    def record(self, task_id: int, fired_at: datetime, outcome: str, planned_at: Optional[datetime] = None,
+               duration_ms: Optional[float] = None, printer: Optional[str] = None, error: Optional[str] = None):
+        row = {
+            "task_id": task_id, "planned_at": to_aware(planned_at), "fired_at": to_aware(fired_at),
+            "outcome": outcome, "duration_ms": duration_ms, "printer": printer, "error": error,
+        }
+        with self._lock:
+            if len(self._rows) >= self.max_buffer:
+                self._rows.popleft()
+                self.dropped += 1
+            self._rows.append(row)
+            full = len(self._rows) >= self.batch_size
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping.clear()
+                self._thread = threading.Thread(target=self._run, name="fire-log", daemon=True)
+                self._thread.start()
+        if full:
+            self._wakeup.set()
+
+    def stop(self, timeout: float = 10.0):
+        """Stop the background thread and write out what is still buffered."""
+        self._stopping.set()
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join(timeout)
+        try:
+            self.flush()
+        except Exception as e:
+            print(f"Fire log: {len(self._rows)} row(s) not written: {e}")
+
+    def flush(self) -> int:
+        """Write everything buffered so far in batches; returns the rows written."""
+        written = 0
+        with self._flush_lock:
+            while True:
+                with self._lock:
+                    batch = [self._rows.popleft() for _ in range(min(self.batch_size, len(self._rows)))]
+                if not batch:
+                    return written
+                try:
+                    add_fire_log(batch)
+                except Exception:
+                    # Back to the front of the buffer for the next attempt
+                    with self._lock:
+                        self._rows.extendleft(reversed(batch))
+                    raise
+                written += len(batch)
+                self.written += len(batch)
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wakeup.wait(self.flush_seconds)
+            self._wakeup.clear()
+            try:
+                self.flush()
+                self._compact_if_due()
+            except Exception as e:
+                # Keep the rows buffered through DB hiccups
+                print(f"Fire log error: {e}")
+
+    def _compact_if_due(self):
+        now = now_tz()
+        if self._last_compaction and now - self._last_compaction < timedelta(hours=1):
+            return
+        self._last_compaction = now
+        # Whole days only, so a day's totals are written once
+        cutoff = (now - timedelta(days=self.retention_days)).replace(hour=0, minute=0, second=0, microsecond=0)
+        compacted = compact_fire_log(cutoff)
+        if compacted:
+            print(f"✅ Compacted {compacted} fire log rows from before {cutoff:%Y-%m-%d} into daily totals")
+
+    def stats(self) -> dict:
+        return {"buffered": len(self._rows), "written": self.written, "dropped": self.dropped}
+
+
+writer = FireLogWriter()
+
+
+def record(task_id: int, fired_at: datetime, outcome: str, **fields):
+    writer.record(task_id, fired_at, outcome, **fields)
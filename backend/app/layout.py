@@ -0,0 +1,217 @@
+# layout.py
+# Receipt text layout: wrapping to the printer's real column count, hyphenation of
+# long (Dutch) words and encoding to the printer codepage.
+import codecs
+import os
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+# Characters per line at normal size: 48 for Font A on 80 mm paper, 32 on 58 mm
+PRINTER_COLUMNS = int(os.getenv("PRINTER_COLUMNS", "48"))
+# Codec of the printer's character table; selected with ESC t at the start of each receipt
+RECEIPT_CODEPAGE = os.getenv("RECEIPT_CODEPAGE", "cp858")
+# Laid-out texts kept in memory (keyed by text and column count)
+LAYOUT_CACHE_SIZE = int(os.getenv("LAYOUT_CACHE_SIZE", "1024"))
+
+# ESC t table numbers as used by Epson-compatible printers
+CODEPAGES = {"cp437": 0, "cp850": 2, "cp1252": 16, "cp858": 19}
+if RECEIPT_CODEPAGE not in CODEPAGES:
+    raise ValueError(f"RECEIPT_CODEPAGE must be one of {', '.join(CODEPAGES)}, got {RECEIPT_CODEPAGE!r}")
+
+# Typography that pasted text brings along and receipts can do without
+_TYPOGRAPHY = {
+    "\u2018": "'", "\u2019": "'", "\u201a": "'", "\u201c": '"', "\u201d": '"', "\u201e": '"',
+    "\u2013": "-", "\u2014": "-", "\u2011": "-", "\u2026": "...", "\u00a0": " ", "\u2022": "*",
+    "\u20ac": "EUR", "\t": " ",
+}
+
+# Hyphenation table: break after these prefixes and before these suffixes
+_PREFIXES = (
+    "achter", "boven", "onder", "tegen", "terug", "schoon", "over", "door", "voor", "mede",
+    "ver", "ont", "her", "uit", "mee", "weg", "be", "ge", "af", "op", "in", "aan", "toe",
+)
+_SUFFIXES = (
+    "heden", "heid", "lijk", "baar", "schap", "achtig", "ingen", "tjes", "ing", "tje", "jes",
+    "loos", "isch", "ste",
+)
+# Consonant clusters that open a syllable and are kept together after a break
+_ONSETS = ("sch", "str", "spr", "ch", "pl", "pr", "bl", "br", "kl", "kr", "tr", "dr", "gr", "fl", "fr")
+_VOWELS = "aeiouyáéíóúàèëïöüâêîôû"
+# The same tables as sets per length, so a word costs a few lookups instead of a scan
+_PREFIX_SET, _SUFFIX_SET, _ONSET_SET = frozenset(_PREFIXES), frozenset(_SUFFIXES), frozenset(_ONSETS)
+_PREFIX_LENGTHS = sorted({len(p) for p in _PREFIXES})
+_SUFFIX_LENGTHS = sorted({len(s) for s in _SUFFIXES})
+# Longest first: "sch" rather than "ch"
+_ONSET_LENGTHS = sorted({len(o) for o in _ONSETS}, reverse=True)
+# A vowel group ("ij" counts as one), then the letters up to the next vowel group
+_SYLLABLE = re.compile(rf"(?:[{_VOWELS}]|(?<=i)j)++([^\W\d_{_VOWELS}]++)(?=[{_VOWELS}])")
+
+
+def columns(width: int = 1) -> int:
+    """Characters per line at a character width multiplier (GS ! width setting)."""
+    return max(PRINTER_COLUMNS // width, 1)
+
+
+def select_codepage(codepage: str = RECEIPT_CODEPAGE) -> bytes:
+    """ESC t command that makes the printer decode text as `codepage`."""
+    return b"\x1bt" + bytes([CODEPAGES[codepage]])
+
+
+@lru_cache(maxsize=None)
+def _translation(codepage: str) -> Dict[int, str]:
+    """str.translate table for everything common that `codepage` lacks."""
+    table = {}
+    candidates = [chr(c) for c in range(0xA0, 0x250)] + list(_TYPOGRAPHY)
+    for ch in candidates:
+        try:
+            ch.encode(codepage)
+            continue
+        except UnicodeEncodeError:
+            pass
+        repl = _TYPOGRAPHY.get(ch)
+        if repl is None:
+            # Accented letters fall back to their base letter: Ŀ -> L, ő -> o
+            repl = "".join(c for c in unicodedata.normalize("NFKD", ch) if not unicodedata.combining(c))
+            try:
+                repl.encode(codepage)
+            except UnicodeEncodeError:
+                continue
+        table[ord(ch)] = repl
+    return table
+
+
+def _substitution(codepage: str):
+    table = _translation(codepage)
+
+    def substitute(exc: UnicodeEncodeError):
+        # Only characters the codepage lacks get here
+        return "".join(table.get(ord(ch), "?") for ch in exc.object[exc.start:exc.end]), exc.end
+    return substitute
+
+
+# One error handler per codepage: charmap codecs don't say which one failed
+for _codepage in CODEPAGES:
+    codecs.register_error(f"receipt-{_codepage}", _substitution(_codepage))
+
+
+def encode(text: str, codepage: str = RECEIPT_CODEPAGE) -> bytes:
+    """Printer bytes for `text` in one pass; anything unmappable becomes "?"."""
+    return text.encode(codepage, f"receipt-{codepage}")
+
+
+@lru_cache(maxsize=4096)
+def _hyphenation_points(word: str) -> Tuple[int, ...]:
+    """Offsets in `word` where it may be broken, ascending."""
+    lower = word.lower()
+    n = len(lower)
+    points = set()
+    if "-" in lower or "/" in lower:
+        for i, ch in enumerate(lower):
+            if ch in "-/" and 0 < i < n - 1:
+                points.add(i + 1)
+    for k in _PREFIX_LENGTHS:
+        if n - k >= 3 and lower[:k] in _PREFIX_SET:
+            points.add(k)
+    for k in _SUFFIX_LENGTHS:
+        if n - k >= 3 and lower[-k:] in _SUFFIX_SET:
+            points.add(n - k)
+    # Syllables: break before the consonant(s) that open the next vowel group
+    for match in _SYLLABLE.finditer(lower):
+        cluster = match.group(1)
+        keep = 1
+        for k in _ONSET_LENGTHS:
+            if cluster[-k:] in _ONSET_SET:
+                keep = k
+                break
+        points.add(match.end() - min(keep, len(cluster)))
+    return tuple(sorted(p for p in points if 2 <= p <= n - 2))
+
+
+def _break_word(word: str, room: int, width: int) -> List[str]:
+    """
+    Pieces of a word longer than `width`: the first fits in `room` (possibly empty),
+    the rest in `width`. Pieces end in a hyphen unless broken at one already.
+    """
+    points = _hyphenation_points(word)
+    pieces = []
+    start = k = 0
+    while len(word) - start > room:
+        cut = 0
+        while k < len(points) and points[k] - start + (word[points[k] - 1] != "-") <= room:
+            cut = points[k]
+            k += 1
+        if cut:
+            pieces.append(word[start:cut] + ("" if word[cut - 1] == "-" else "-"))
+            start = cut
+        elif room == width:
+            # No break point fits on a whole line: cut hard
+            pieces.append(word[start:start + room])
+            start += room
+            while k < len(points) and points[k] <= start:
+                k += 1
+        else:
+            pieces.append("")
+        room = width
+    pieces.append(word[start:])
+    return pieces
+
+
+@lru_cache(maxsize=4096)
+def _substitute(word: str) -> str:
+    """A non-ASCII word as encode() will print it; words repeat far more often than they are new."""
+    return word.translate(_translation(RECEIPT_CODEPAGE))
+
+
+@lru_cache(maxsize=LAYOUT_CACHE_SIZE)
+def wrap(text: str, width: int) -> Tuple[str, ...]:
+    """
+    Greedy word wrap to `width` columns. Explicit newlines are kept and words longer
+    than a line are hyphenated. Words are measured after the substitutions encode()
+    makes, so "..." for an ellipsis still fits.
+    """
+    lines: List[str] = []
+    # Pure-ASCII text, the usual case, needs neither normalization nor substitutions
+    ascii_only = text.isascii()
+    if not ascii_only:
+        text = unicodedata.normalize("NFC", text)
+    for paragraph in text.strip("\n").split("\n"):
+        words = paragraph.split()
+        if not ascii_only:
+            words = [word if word.isascii() else _substitute(word) for word in words]
+        _wrap_paragraph(" ".join(words), width, lines)
+    return tuple(lines)
+
+
+def _wrap_paragraph(text: str, width: int, lines: List[str]):
+    """
+    Append the lines of single-spaced `text`. Each line ends at the last space within
+    reach (str.rfind), so the loop runs per line rather than per word.
+    """
+    start, end = 0, len(text)
+    # Whether the last line appended ended only because the next word didn't fit
+    line_open = False
+    while end - start > width:
+        cut = text.rfind(" ", start, start + width + 1)
+        if cut > start:
+            lines.append(text[start:cut])
+            start = cut + 1
+            line_open = True
+            continue
+        # No space within reach: the word at `start` is longer than a line. Hyphenate it,
+        # starting in the room left on the line before it
+        word_end = text.find(" ", start)
+        if word_end < 0:
+            word_end = end
+        line = lines.pop() if line_open else ""
+        pieces = _break_word(text[start:word_end], width - len(line) - 1 if line else width, width)
+        if pieces[0]:
+            line = f"{line} {pieces[0]}" if line else pieces[0]
+        if line:
+            lines.append(line)
+        lines.extend(pieces[1:-1])
+        # The last piece is the word's tail, which opens the next line
+        start = word_end - len(pieces[-1])
+        line_open = False
+    lines.append(text[start:])
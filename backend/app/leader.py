@@ -0,0 +1,128 @@
+# leader.py
+# Picks the one process that runs the scheduler and print spooler when uvicorn runs several workers.
+import os
+import socket
+import threading
+import time
+import uuid
+from typing import Callable, Optional
+from crud import acquire_lease, release_lease, get_lease
+
+# How long a lease holds without renewal; a dead leader is replaced within about this long
+LEADER_LEASE_SECONDS = float(os.getenv("LEADER_LEASE_SECONDS", "10"))
+# How often every process renews (leader) or tries to take (followers) the lease
+LEADER_HEARTBEAT_SECONDS = float(os.getenv("LEADER_HEARTBEAT_SECONDS", "2"))
+
+
+class LeaderElection:
+    """
+    Lease-based election through a row in the lease table. Each heartbeat the leader
+    renews the lease and every other process tries to take it, which only succeeds once
+    it has lapsed; writes to the row are serialized by the database, so at most one
+    process holds it. A leader that cannot renew steps down a heartbeat before its lease
+    runs out, so the next one never starts while it is still firing.
+    """
+
+    def __init__(self, name: str, on_elected: Callable[[], None], on_demoted: Callable[[], None],
+                 lease_seconds: float = LEADER_LEASE_SECONDS, heartbeat_seconds: float = LEADER_HEARTBEAT_SECONDS):
+        self.name = name
+        self.holder = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.lease_seconds = lease_seconds
+        self.heartbeat_seconds = heartbeat_seconds
+        self.leading = False
+        self.terms = 0
+        self._on_elected = on_elected
+        self._on_demoted = on_demoted
+        # Monotonic time by which the leader must have renewed, or step down
+        self._deadline = 0.0
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # Runs on_elected, which may take a while (rehydration), while heartbeats go on
+        self._starter: Optional[threading.Thread] = None
+        self._failed = False
+        self._lock = threading.RLock()
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        # First round inline, so a single process leads as soon as it has started
+        self._beat()
+        self._thread = threading.Thread(target=self._run, name=f"leader-{self.name}", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop campaigning and hand the lease over straight away if we hold it."""
+        self._stopping.set()
+        if self._thread:
+            self._thread.join(self.heartbeat_seconds + 5)
+        if self.leading:
+            self._demote("shutting down")
+            try:
+                release_lease(self.name, self.holder)
+            except Exception as e:
+                print(f"Could not release {self.name} lease: {e}")
+
+    def _run(self):
+        while not self._stopping.wait(self.heartbeat_seconds):
+            self._beat()
+
+    def _beat(self):
+        started = time.monotonic()
+        try:
+            held = acquire_lease(self.name, self.holder, self.lease_seconds, time.time())
+        except Exception as e:
+            print(f"Leader election error ({self.name}): {e}")
+            if self.leading and time.monotonic() >= self._deadline:
+                self._demote("lease could not be renewed")
+            return
+        with self._lock:
+            if held and self._failed:
+                self._demote("startup failed")
+                release_lease(self.name, self.holder)
+            elif held:
+                self._deadline = started + self.lease_seconds - self.heartbeat_seconds
+                if not self.leading:
+                    self._elect()
+            elif self.leading:
+                self._demote("lease taken over")
+
+    def _elect(self):
+        self.leading = True
+        self._failed = False
+        self.terms += 1
+        print(f"✅ Elected {self.name} leader ({self.holder})")
+        self._starter = threading.Thread(target=self._start_leading, name=f"leader-{self.name}-start", daemon=True)
+        self._starter.start()
+
+    def _start_leading(self):
+        try:
+            self._on_elected()
+        except Exception as e:
+            # The next heartbeat steps down, so another process gets a go
+            print(f"Failed to start as {self.name} leader: {e}")
+            self._failed = True
+
+    def _demote(self, reason: str):
+        with self._lock:
+            if not self.leading:
+                return
+            self.leading = False
+            print(f"Stepping down as {self.name} leader: {reason}")
+            starter = self._starter
+            if starter is not None and starter is not threading.current_thread():
+                # Tear down only what on_elected has finished setting up
+                starter.join()
+            try:
+                self._on_demoted()
+            except Exception as e:
+                print(f"Error stepping down as {self.name} leader: {e}")
+
+    def stats(self) -> dict:
+        lease = get_lease(self.name)
+        return {
+            "holder": self.holder,
+            "leading": self.leading,
+            "terms": self.terms,
+            "leader": lease.holder if lease and lease.expires_at >= time.time() else None,
+        }
@@ -1,20 +1,44 @@
 # main.py
-from fastapi import FastAPI, HTTPException, APIRouter
+import time
+_import_started = time.perf_counter()
+
+from fastapi import FastAPI, HTTPException, APIRouter, Depends, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response, StreamingResponse, JSONResponse
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from typing import List, Optional
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from pydantic import TypeAdapter
 from pydantic_settings import BaseSettings
-from datetime import datetime
+from datetime import datetime, timedelta
+from contextlib import asynccontextmanager, contextmanager
+import asyncio
 import os
-import socket
+import threading
 
 # ---- local modules (absolute imports) ----
 from database import init_db
-from schemas import TaskCreate, TaskRead, TaskUpdate, ImportPayload, BlackoutPeriodCreate, BlackoutPeriodRead, BlackoutPeriodUpdate
+from schemas import TaskCreate, TaskRead, TaskUpdate, BlackoutPeriodCreate, BlackoutPeriodRead, BlackoutPeriodUpdate, OccurrenceRead, PrintJobRead, FireLogRead, FireLogSummaryRead
 from models import Task, BlackoutPeriod
-from crud import create_task, list_tasks, get_task, update_task, delete_task, create_blackout_period, list_blackout_periods, get_blackout_period, update_blackout_period, delete_blackout_period
-from printing import ThermalPrinter
-from scheduling import schedule_task, start as start_scheduler
+from crud import list_tasks, get_table_version, page_fire_log, summarize_fire_log
+import async_crud
+from pagination import encode_cursor, decode_cursor
+from spooler import spooler, SpoolFullError
+from printers import registry as printer_registry
+from printing import send_raw
+from occurrences import expand_task
+from importer import BulkImporter, batched, iter_ndjson_batches
+from exporter import iter_export, gzipped, export_etag, etag_matches, MEDIA_TYPES as EXPORT_MEDIA_TYPES
+import blackouts
+import metrics
+import events
+import firelog
+from responsecache import cache as response_cache
+from rrules import cache_stats as rrule_cache_stats
+import scheduling
+from scheduling import schedule_task, rehydrate, start as start_scheduler
+from leader import LeaderElection
 from utils import now_tz, to_aware
 
 # =========================
@@ -24,13 +48,112 @@ class Settings(BaseSettings):
     PRINTER_IP: str = os.getenv("PRINTER_IP", "192.168.2.34")
     PRINTER_PORT: int = int(os.getenv("PRINTER_PORT", "9100"))
     TZ: str = os.getenv("TZ", "Europe/Amsterdam")
+    # Largest calendar window /api/occurrences will expand in one request
+    OCCURRENCES_MAX_DAYS: int = int(os.getenv("OCCURRENCES_MAX_DAYS", "400"))
 
 settings = Settings()
 
+# Largest page /api/tasks and /api/blackout-periods serve per request
+MAX_PAGE_SIZE = 1000
+
+NDJSON_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+# =========================
+# Bootstrap
+# =========================
+# Runs after the server is listening, so /api/live answers while the database comes up; the
+# scheduler and print spooler run in one process only. Under `uvicorn --workers N` every
+# worker serves the API and they elect which one fires tasks
+
+# Seconds per startup phase, logged and shown by /api/ready
+startup: Dict[str, float] = {"imports": round(time.perf_counter() - _import_started, 3)}
+_ready = threading.Event()
+_startup_error: Optional[str] = None
+
+@contextmanager
+def _phase(name: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        startup[name] = round(time.perf_counter() - started, 3)
+
+def _lead():
+    """Elected: re-register jobs for existing tasks, start the scheduler and print spooler."""
+    # Whatever fell due while the previous leader's lease ran out
+    with _phase("lead.fire_missed"):
+        scheduling.fire_missed(election.lease_seconds + 2 * election.heartbeat_seconds)
+    with _phase("lead.rehydrate"):
+        rehydrate()
+    with _phase("lead.scheduler"):
+        start_scheduler()
+    with _phase("lead.spooler"):
+        spooler.start()
+    phases = ", ".join(f"{name[5:]} {seconds}s" for name, seconds in list(startup.items()) if name.startswith("lead."))
+    print(f"✅ Scheduler and print spooler up ({phases})")
+
+def _step_down():
+    scheduling.standby()
+    spooler.stop()
+
+election = LeaderElection("scheduler", _lead, _step_down)
+
+def _init_db(attempts: int):
+    for attempt in range(1, attempts + 1):
+        try:
+            with _phase("database"):
+                init_db()
+            return
+        except Exception as e:
+            # e.g. workers racing to create the tables of a new database, or the database still coming up
+            if attempt == attempts:
+                raise
+            print(f"Database not ready (attempt {attempt}/{attempts}): {str(e).splitlines()[0]}")
+            time.sleep(0.5 * 2 ** (attempt - 1))
+
+def _bootstrap(attempts: int = 5):
+    global _startup_error
+    started = time.perf_counter()
+    try:
+        _init_db(attempts)
+        scheduling.standby()
+        with _phase("election"):
+            # Failures here are retried by the election's own heartbeat
+            election.start()
+    except Exception as e:
+        # Reported by /api/live, so the orchestrator restarts the process
+        _startup_error = str(e)
+        print(f"Startup failed: {e}")
+        return
+    startup["ready"] = round(startup["imports"] + time.perf_counter() - started, 3)
+    _ready.set()
+    phases = ", ".join(f"{name} {startup[name]}s" for name in ("imports", "database", "election"))
+    print(f"✅ Ready in {startup['ready']}s ({phases})")
+
+def _shutdown():
+    election.stop()
+    # Last, so it writes out what the spooler logged while stopping
+    firelog.writer.stop()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    bootstrap = asyncio.get_running_loop().run_in_executor(None, _bootstrap)
+    try:
+        yield
+    finally:
+        try:
+            await bootstrap
+        finally:
+            await run_in_threadpool(_shutdown)
+
+async def _require_ready():
+    if not _ready.is_set():
+        raise HTTPException(503, "Starting up", headers={"Retry-After": "1"})
+
 # =========================
 # App & middleware
 # =========================
-app = FastAPI(title="TaskPrinter (UI + API)")
+app = FastAPI(title="TaskPrinter (UI + API)", lifespan=lifespan)
 
 # If you keep everything same-origin (UI served by this app) CORS isn't strictly needed,
 # but leaving it permissive avoids trouble if you later front this with a proxy.
@@ -40,20 +163,29 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
 # =========================
-# Bootstrap
+# Probes (answer during startup)
 # =========================
-# Initialize DB, start scheduler, set up printer once on import
-init_db()
-start_scheduler()
-printer = ThermalPrinter(settings.PRINTER_IP, settings.PRINTER_PORT)
+@app.get("/api/live")
+async def live():
+    """Liveness: the process serves requests; fails only if startup failed and a restart is due."""
+    if _startup_error:
+        return JSONResponse({"status": "failed", "error": _startup_error}, status_code=503)
+    return {"status": "ok"}
+
+@app.get("/api/ready")
+async def ready():
+    """Readiness: the database is up and the API can take traffic (every other /api route returns 503 until then)."""
+    body = {"status": "ready" if _ready.is_set() else "starting", "startup": dict(startup)}
+    return JSONResponse(body, status_code=200 if _ready.is_set() else 503)
 
 # =========================
 # API (prefixed at /api)
 # =========================
-API = APIRouter(prefix="/api")
+API = APIRouter(prefix="/api", dependencies=[Depends(_require_ready)])
 
 @API.get("/health")
 def health():
@@ -61,98 +193,299 @@ def health():
         "status": "ok",
         "now": now_tz().isoformat(),
         "printer": {"ip": settings.PRINTER_IP, "port": settings.PRINTER_PORT},
+        **printer_registry.describe(),
+        "rrule_cache": rrule_cache_stats(),
+        "rehydration": scheduling.last_rehydration,
+        "leader": election.stats(),
+        "print_queue_depth": spooler.queue_depth(),
+        "print_queue_depths": spooler.queue_depths(),
+        "response_cache": response_cache.stats(),
+        "events": events.bus.stats(),
+        "fire_log": firelog.writer.stats(),
     }
 
+@API.get("/events")
+async def api_events(request: Request):
+    """
+    Server-sent events: task.created/updated/deleted, tasks.created (imports), tasks.rescheduled,
+    blackout.created/updated/deleted, task.fired/tasks.fired and print.done/retry/failed.
+    Reconnecting clients get what they missed via Last-Event-ID, or a `resync` event when
+    that is no longer available and they should refetch.
+    """
+    return StreamingResponse(
+        events.bus.stream(request.headers.get("last-event-id")),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@API.get("/metrics")
+def prometheus_metrics():
+    """Scheduler lag, print phase timings, query durations, queue depths and failures for Prometheus."""
+    return Response(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+def _parse_fields(fields: Optional[str], model) -> Optional[List[str]]:
+    """?fields=a,b -> ["id", "a", "b"]; the id always comes along."""
+    if not fields:
+        return None
+    names = ["id"] + [f.strip() for f in fields.split(",") if f.strip() and f.strip() != "id"]
+    unknown = [f for f in names if f not in model.model_fields]
+    if unknown:
+        raise HTTPException(400, f"Unknown field(s): {', '.join(unknown)}")
+    return list(dict.fromkeys(names))
+
+_TASK_LIST = TypeAdapter(List[TaskRead])
+_TASK = TypeAdapter(TaskRead)
+_BLACKOUT_LIST = TypeAdapter(List[BlackoutPeriodRead])
+# Change counters behind the task endpoints (content edits, scheduler fires)
+_TASK_TABLES = ("task", "task_schedule")
+
+def _serialize(adapter: TypeAdapter, value) -> bytes:
+    """Validate ORM objects into the response model and encode them, as FastAPI would."""
+    return adapter.dump_json(adapter.validate_python(value, from_attributes=True))
+
+def _page_body(items: list, next_key, sort: str, fields: Optional[List[str]], adapter: TypeAdapter) -> Tuple[bytes, Dict[str, str]]:
+    """Page body plus the X-Next-Cursor header; projected rows skip the full response model."""
+    headers = {"X-Next-Cursor": encode_cursor(sort, next_key)} if next_key is not None else {}
+    if fields:
+        return JSONResponse(jsonable_encoder(items)).body, headers
+    return _serialize(adapter, items), headers
+
+async def _cached_read(request: Request, endpoint: str, params: tuple, tables: Tuple[str, ...],
+                       produce: Callable[[], Awaitable[Tuple[bytes, Dict[str, str]]]]) -> Response:
+    """
+    Serve a read from the response cache, keyed by the endpoint, its parameters and the
+    change counters of the tables it reads; any write therefore misses the old entries.
+    The ETag is derived from the same key, so If-None-Match can answer 304 without a query.
+    """
+    key = (endpoint, params, await async_crud.get_table_versions(*tables))
+    etag = response_cache.etag(key)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers=headers)
+    entry = response_cache.get(key)
+    if entry is None:
+        entry = response_cache.put(key, *await produce())
+    return Response(entry.body, media_type="application/json", headers={**headers, **entry.headers})
+
 @API.get("/tasks", response_model=List[TaskRead])
-def api_list_tasks(search: Optional[str] = None, category: Optional[str] = None):
-    return list_tasks(search=search, category=category)
+async def api_list_tasks(
+    request: Request,
+    search: Optional[str] = None,
+    category: Optional[str] = None,
+    active: Optional[bool] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    sort: Optional[str] = Query(None, pattern="^(id|start_at|rank)$"),
+    fields: Optional[str] = None,
+):
+    """
+    Lists tasks, best search matches first. With `limit` the list is paged by keyset:
+    pass the X-Next-Cursor response header back as `cursor` for the next page.
+    `fields=title,category` returns only those columns (plus id).
+    Responses carry an ETag and are cached until the next task write.
+    """
+    selected = _parse_fields(fields, TaskRead)
+
+    async def produce():
+        if limit is None and cursor is None and selected is None and sort is None:
+            return _serialize(_TASK_LIST, await async_crud.list_tasks(search=search, category=category, active=active)), {}
+        order = sort or ("rank" if search else "id")
+        try:
+            after = decode_cursor(cursor, order) if cursor else None
+            items, next_key = await async_crud.page_tasks(
+                search=search, category=category, active=active,
+                limit=limit, after=after, sort=order, fields=selected,
+            )
+        except ValueError as e:
+            raise HTTPException(400, str(e))
+        return _page_body(items, next_key, order, selected, _TASK_LIST)
+
+    params = (search, category, active, limit, cursor, sort, tuple(selected or ()))
+    return await _cached_read(request, "tasks", params, _TASK_TABLES, produce)
 
 @API.post("/tasks", response_model=TaskRead)
-def api_create_task(payload: TaskCreate):
+async def api_create_task(payload: TaskCreate):
     # coerce datetimes to timezone-aware
     t = Task(**payload.dict())
     t.start_at = to_aware(t.start_at)
     if t.until:
         t.until = to_aware(t.until)
-    t = create_task(t)
-    schedule_task(t)
+    t = await async_crud.create_task(t)
+    await run_in_threadpool(schedule_task, t)
     return t
 
 @API.get("/tasks/{task_id}", response_model=TaskRead)
-def api_get_task(task_id: int):
-    t = get_task(task_id)
-    if not t:
-        raise HTTPException(404, "Task not found")
-    return t
+async def api_get_task(task_id: int, request: Request):
+    async def produce():
+        t = await async_crud.get_task(task_id)
+        if not t:
+            raise HTTPException(404, "Task not found")
+        return _serialize(_TASK, t), {}
+
+    return await _cached_read(request, "task", (task_id,), _TASK_TABLES, produce)
 
 @API.patch("/tasks/{task_id}", response_model=TaskRead)
-def api_update_task(task_id: int, payload: TaskUpdate):
+async def api_update_task(task_id: int, payload: TaskUpdate):
     data = {k: v for k, v in payload.dict().items() if v is not None}
     if "start_at" in data and data["start_at"] is not None:
         data["start_at"] = to_aware(data["start_at"])
     if "until" in data and data["until"] is not None:
         data["until"] = to_aware(data["until"])
-    updated = update_task(task_id, **data)
+    updated = await async_crud.update_task(task_id, **data)
     if not updated:
         raise HTTPException(404, "Task not found")
-    schedule_task(updated)
+    await run_in_threadpool(schedule_task, updated)
     return updated
 
 @API.delete("/tasks/{task_id}")
-def api_delete_task(task_id: int):
-    ok = delete_task(task_id)
+async def api_delete_task(task_id: int):
+    ok = await async_crud.delete_task(task_id)
     if not ok:
         raise HTTPException(404, "Task not found")
     return {"ok": True}
 
+@API.get("/occurrences", response_model=List[OccurrenceRead])
+def api_list_occurrences(
+    start: datetime = Query(..., alias="from"),
+    end: datetime = Query(..., alias="to"),
+    category: Optional[str] = None,
+):
+    """
+    Expands every active task into concrete occurrences within [from, to].
+    Blackout periods and Task.until are applied; expansions are cached per task/window.
+    """
+    start, end = to_aware(start), to_aware(end)
+    if end <= start:
+        raise HTTPException(400, "'to' must be after 'from'")
+    if end - start > timedelta(days=settings.OCCURRENCES_MAX_DAYS):
+        raise HTTPException(400, f"Window may span at most {settings.OCCURRENCES_MAX_DAYS} days")
+
+    # Only probe the blackout index per occurrence if the window touches one at all
+    blackouts.sync()
+    check_blackouts = blackouts.index.overlaps(start, end)
+
+    result = []
+    for t in list_tasks(category=category, active=True):
+        for dt in expand_task(t, start, end):
+            if check_blackouts and blackouts.index.contains(dt):
+                continue
+            result.append({"task_id": t.id, "title": t.title, "category": t.category, "start": dt})
+    result.sort(key=lambda o: o["start"])
+    return result
+
 @API.post("/tasks/{task_id}/print")
-def api_print_task(task_id: int):
-    t = get_task(task_id)
+async def api_print_task(task_id: int):
+    t = await async_crud.get_task(task_id)
     if not t:
         raise HTTPException(404, "Task not found")
-    printer.print_task(t.title, t.description, t.category)
-    return {"printed": True}
+    try:
+        job = await spooler.submit_async(t.title, t.description, t.category, task_id=t.id)
+    except SpoolFullError as e:
+        raise HTTPException(503, str(e))
+    return {"job_id": job.id, "status": job.status}
+
+@API.get("/print-jobs/{job_id}", response_model=PrintJobRead)
+async def api_get_print_job(job_id: int):
+    job = await async_crud.get_print_job(job_id)
+    if not job:
+        raise HTTPException(404, "Print job not found")
+    return job
+
+def _fire_log_window(start: Optional[datetime], end: Optional[datetime], default: timedelta) -> Tuple[datetime, datetime]:
+    end = to_aware(end) if end else now_tz()
+    start = to_aware(start) if start else end - default
+    if end <= start:
+        raise HTTPException(400, "'to' must be after 'from'")
+    return start, end
+
+@API.get("/fire-log", response_model=List[FireLogRead])
+def api_list_fire_log(
+    response: Response,
+    start: Optional[datetime] = Query(None, alias="from"),
+    end: Optional[datetime] = Query(None, alias="to"),
+    task_id: Optional[int] = None,
+    outcome: Optional[str] = Query(None, pattern="^(printed|failed|skipped_blackout|dropped|no_print)$"),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+):
+    """
+    Fires in [from, to) (default: the last day) in fire order, with what became of each
+    receipt; page with the X-Next-Cursor header as for /api/tasks. Rows are written in
+    batches, so the last few seconds may not show yet, and rows older than
+    FIRE_LOG_RETENTION_DAYS only remain as totals in /api/fire-log/summary.
+    """
+    start, end = _fire_log_window(start, end, timedelta(days=1))
+    try:
+        after = decode_cursor(cursor, "fired_at") if cursor else None
+        items, next_key = page_fire_log(start, end, task_id, outcome, limit=limit, after=after)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    if next_key is not None:
+        response.headers["X-Next-Cursor"] = encode_cursor("fired_at", next_key)
+    return items
+
+@API.get("/fire-log/summary", response_model=List[FireLogSummaryRead])
+def api_fire_log_summary(
+    start: Optional[datetime] = Query(None, alias="from"),
+    end: Optional[datetime] = Query(None, alias="to"),
+    task_id: Optional[int] = None,
+):
+    """Fire counts and print durations per day and outcome over [from, to) (default: the last 30 days)."""
+    start, end = _fire_log_window(start, end, timedelta(days=30))
+    return summarize_fire_log(start, end, task_id)
 
 @API.post("/import")
-def api_import(payload: ImportPayload):
-    created = []
-    for t in payload.tasks:
-        obj = Task(**t.dict())
-        obj.start_at = to_aware(obj.start_at)
-        if obj.until:
-            obj.until = to_aware(obj.until)
-        created.append(create_task(obj))
-    for t in created:
-        schedule_task(t)
-    return {"count": len(created)}
+async def api_import(request: Request):
+    """
+    Bulk-imports tasks, either as JSON {"tasks": [...]} or, with Content-Type
+    application/x-ndjson, as one task per line streamed in batches.
+    Invalid rows are skipped and reported by (1-based) row number.
+    """
+    importer = BulkImporter()
+    if request.headers.get("content-type", "").split(";")[0].strip() in NDJSON_TYPES:
+        async for batch in iter_ndjson_batches(request.stream()):
+            await run_in_threadpool(importer.add_batch, batch)
+    else:
+        try:
+            payload = await request.json()
+        except ValueError:
+            raise HTTPException(400, "Body must be JSON or NDJSON")
+        if not isinstance(payload, dict) or not isinstance(payload.get("tasks"), list):
+            raise HTTPException(400, "Expected an object with a 'tasks' list")
+        for batch in batched(enumerate(payload["tasks"], start=1)):
+            await run_in_threadpool(importer.add_batch, batch)
+    return await run_in_threadpool(importer.finish)
 
 @API.get("/export")
-def api_export():
-    tasks = list_tasks()
-    export_data = {
-        "tasks": [
-            {
-                "title": task.title,
-                "description": task.description,
-                "start_at": task.start_at.isoformat(),
-                "until": task.until.isoformat() if task.until else None,
-                "rrule": task.rrule,
-                "auto_print": task.auto_print,
-                "is_active": task.is_active,
-                "category": task.category
-            }
-            for task in tasks
-        ]
-    }
-    return export_data
+def api_export(request: Request, format: str = Query("json", pattern="^(json|ndjson)$")):
+    """
+    Streams every task as JSON {"tasks": [...]} or NDJSON (?format=ndjson), reading the
+    table in chunks. Gzipped when the client accepts it. The ETag follows the task change
+    counter, so a conditional request for unchanged data gets a bodiless 304.
+    """
+    gzip = "gzip" in request.headers.get("accept-encoding", "")
+    etag = export_etag(get_table_version("task"), format, gzip)
+    headers = {"ETag": etag, "Vary": "Accept-Encoding", "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers=headers)
+    body = iter_export(format)
+    if gzip:
+        body = gzipped(body)
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(body, media_type=EXPORT_MEDIA_TYPES[format], headers=headers)
 
 @API.get("/print-test")
-def api_print_test():
+async def api_print_test(printer: Optional[str] = None):
     """
-    Sends a minimal ESC/POS test to the configured printer via raw TCP 9100.
+    Sends a minimal ESC/POS test to a configured printer via raw TCP 9100
+    (the first one unless ?printer=<name> is given).
     Useful to verify container->printer connectivity without creating a task.
     """
-    host, port = settings.PRINTER_IP, settings.PRINTER_PORT
+    name = printer or printer_registry.names()[0]
+    if name not in printer_registry.printers:
+        raise HTTPException(404, "Printer not found")
+    target = printer_registry.get(name)
+    host, port = target.host, target.port
     ESC, GS = b"\x1b", b"\x1d"
     msg = [
         ESC + b"@",                    # init
@@ -160,45 +493,67 @@ def api_print_test():
         ESC + b"a\x00", b"Printed via /api/print-test\n\n\n",
         GS + b"V\x00",                 # full cut
     ]
-    with socket.create_connection((host, port), timeout=5) as s:
-        for part in msg:
-            s.sendall(part)
-    return {"message": "Test print sent", "target": f"{host}:{port}"}
+    try:
+        await send_raw(host, port, b"".join(msg))
+    except (OSError, asyncio.TimeoutError) as e:
+        raise HTTPException(502, f"Printer {name} at {host}:{port} unreachable: {e}")
+    return {"message": "Test print sent", "printer": name, "target": f"{host}:{port}"}
 
 # Blackout Period endpoints
 @API.get("/blackout-periods", response_model=List[BlackoutPeriodRead])
-def api_list_blackout_periods():
-    return list_blackout_periods()
+async def api_list_blackout_periods(
+    request: Request,
+    active: Optional[bool] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    sort: str = Query("id", pattern="^(id|start_date)$"),
+    fields: Optional[str] = None,
+):
+    """Lists blackout periods; paging, projection and caching work as for /api/tasks."""
+    selected = _parse_fields(fields, BlackoutPeriodRead)
+
+    async def produce():
+        if limit is None and cursor is None and selected is None and active is None and sort == "id":
+            return _serialize(_BLACKOUT_LIST, await async_crud.list_blackout_periods()), {}
+        try:
+            after = decode_cursor(cursor, sort) if cursor else None
+            items, next_key = await async_crud.page_blackout_periods(active=active, limit=limit, after=after, sort=sort, fields=selected)
+        except ValueError as e:
+            raise HTTPException(400, str(e))
+        return _page_body(items, next_key, sort, selected, _BLACKOUT_LIST)
+
+    params = (active, limit, cursor, sort, tuple(selected or ()))
+    return await _cached_read(request, "blackout-periods", params, ("blackoutperiod",), produce)
 
 @API.post("/blackout-periods", response_model=BlackoutPeriodRead)
-def api_create_blackout_period(payload: BlackoutPeriodCreate):
+async def api_create_blackout_period(payload: BlackoutPeriodCreate):
     b = BlackoutPeriod(**payload.dict())
     b.start_date = to_aware(b.start_date)
     b.end_date = to_aware(b.end_date)
-    return create_blackout_period(b)
+    return await async_crud.create_blackout_period(b)
 
 @API.get("/blackout-periods/{blackout_id}", response_model=BlackoutPeriodRead)
-def api_get_blackout_period(blackout_id: int):
-    b = get_blackout_period(blackout_id)
+async def api_get_blackout_period(blackout_id: int):
+    b = await async_crud.get_blackout_period(blackout_id)
     if not b:
         raise HTTPException(404, "Blackout period not found")
     return b
 
 @API.patch("/blackout-periods/{blackout_id}", response_model=BlackoutPeriodRead)
-def api_update_blackout_period(blackout_id: int, payload: BlackoutPeriodUpdate):
+async def api_update_blackout_period(blackout_id: int, payload: BlackoutPeriodUpdate):
     data = {k: v for k, v in payload.dict().items() if v is not None}
     if "start_date" in data and data["start_date"] is not None:
         data["start_date"] = to_aware(data["start_date"])
     if "end_date" in data and data["end_date"] is not None:
         data["end_date"] = to_aware(data["end_date"])
-    updated = update_blackout_period(blackout_id, **data)
+    updated = await async_crud.update_blackout_period(blackout_id, **data)
     if not updated:
         raise HTTPException(404, "Blackout period not found")
     return updated
 
 @API.delete("/blackout-periods/{blackout_id}")
-def api_delete_blackout_period(blackout_id: int):
-    ok = delete_blackout_period(blackout_id)
+async def api_delete_blackout_period(blackout_id: int):
+    ok = await async_crud.delete_blackout_period(blackout_id)
     if not ok:
         raise HTTPException(404, "Blackout period not found")
     return {"ok": True}
@@ -1,6 +1,7 @@
 from typing import Optional
-from datetime import datetime
+from datetime import date, datetime
 from sqlmodel import SQLModel, Field
+from utils import now_tz
 
 class Task(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
@@ -18,13 +19,73 @@ class Task(SQLModel, table=True):
     is_active: bool = True
     # Last time we printed this task (for recurrence progression)
     last_fired_at: Optional[datetime] = None
+    # Next planned fire time (materialized so the due-task poller can use an index)
+    next_run_at: Optional[datetime] = Field(default=None, index=True)
     # Task location for organization and color coding
     category: str = "other"
 
+class TableVersion(SQLModel, table=True):
+    # Change counter per table, bumped by crud in the same transaction as the write
+    name: str = Field(primary_key=True)
+    version: int = 0
+
+class Lease(SQLModel, table=True):
+    # Named lock held by one process at a time (e.g. "scheduler"); lapses unless renewed
+    name: str = Field(primary_key=True)
+    holder: str
+    # Epoch seconds, so holders in different timezones or across DST compare correctly
+    expires_at: float
+
 class BlackoutPeriod(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     name: str = ""  # Optional name for the blackout period (e.g. "Christmas Holiday")
     start_date: datetime
     end_date: datetime
     is_active: bool = True
-    created_at: datetime = Field(default_factory=datetime.now)
\ No newline at end of file
+    created_at: datetime = Field(default_factory=datetime.now)
+
+class PrintJob(SQLModel, table=True):
+    id: Optional[int] = Field(default=None, primary_key=True)
+    # Task this receipt was printed for (None for ad-hoc prints)
+    task_id: Optional[int] = Field(default=None, index=True)
+    # Run time of the fire that queued it (None for ad-hoc prints); ties the outcome to the fire log
+    planned_at: Optional[datetime] = None
+    # Snapshot of what to print, so later task edits don't change a queued receipt
+    title: str
+    description: str = ""
+    category: str = "other"
+    # Registry name of the printer this job is routed to
+    printer: str = Field(default="default", index=True)
+    # queued -> printing -> done | failed (printing goes back to queued on retry)
+    status: str = Field(default="queued", index=True)
+    attempts: int = 0
+    last_error: Optional[str] = None
+    created_at: datetime = Field(default_factory=now_tz)
+    next_attempt_at: datetime = Field(default_factory=now_tz)
+    finished_at: Optional[datetime] = None
+
+class FireLog(SQLModel, table=True):
+    # Append-only history of fires and their receipts, written in batches by firelog.py
+    __tablename__ = "fire_log"
+    id: Optional[int] = Field(default=None, primary_key=True)
+    task_id: int
+    # The run time the task was scheduled for, and when it actually fired
+    planned_at: Optional[datetime] = None
+    fired_at: datetime = Field(index=True)
+    # printed | failed | skipped_blackout | dropped (print queue full) | no_print (auto_print off)
+    outcome: str
+    # printed/failed only: from the fire until the receipt was printed or given up on
+    duration_ms: Optional[float] = None
+    printer: Optional[str] = None
+    error: Optional[str] = None
+
+class FireLogDaily(SQLModel, table=True):
+    # fire_log rows past retention, compacted into totals per day, task and outcome
+    __tablename__ = "fire_log_daily"
+    id: Optional[int] = Field(default=None, primary_key=True)
+    day: date = Field(index=True)
+    task_id: int
+    outcome: str
+    count: int
+    duration_ms_total: float = 0.0
+    duration_ms_max: Optional[float] = None
@@ -0,0 +1,75 @@
+# occurrences.py
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List
+from models import Task
+from utils import to_aware
+from rrules import compile_rrule, fast_forward
+
+# Hard cap per task per window so a FREQ=MINUTELY rule can't blow up a request
+MAX_OCCURRENCES_PER_TASK = 1000
+# How many distinct (from, to) windows we remember per task (LRU)
+MAX_WINDOWS_PER_TASK = 8
+
+_lock = threading.Lock()
+# task id -> (window, rrule, start_at, until) -> occurrences
+_cache: Dict[int, "OrderedDict[tuple, List[datetime]]"] = {}
+# Bumped on every invalidation so an expansion racing with an update is not stored
+_versions: Dict[int, int] = {}
+
+
+def _expand(task: Task, start: datetime, end: datetime) -> List[datetime]:
+    """Expand a single task into its occurrences within [start, end]."""
+    base = to_aware(task.start_at)
+    if task.until:
+        end = min(end, to_aware(task.until))
+    if end < start:
+        return []
+
+    if not task.rrule:
+        return [base] if start <= base <= end else []
+
+    try:
+        rule = compile_rrule(task.rrule, task.start_at, task.until)
+    except (ValueError, TypeError) as e:
+        print(f"Skipping task {task.id} with invalid RRULE {task.rrule!r}: {e}")
+        return []
+
+    occurrences = []
+    # Start iterating near the window, not at dtstart: an hourly rule from last year is 8760 steps in
+    for dt in fast_forward(rule, start).xafter(start, inc=True):
+        if dt > end or len(occurrences) >= MAX_OCCURRENCES_PER_TASK:
+            break
+        occurrences.append(dt)
+    return occurrences
+
+
+def expand_task(task: Task, start: datetime, end: datetime) -> List[datetime]:
+    """Occurrences of `task` within [start, end], cached per (task, window)."""
+    # The rule is part of the key, so edits made through another worker never hit stale entries
+    key = (start, end, task.rrule, task.start_at, task.until)
+    with _lock:
+        windows = _cache.get(task.id)
+        if windows is not None and key in windows:
+            windows.move_to_end(key)
+            return windows[key]
+        version = _versions.get(task.id, 0)
+
+    occurrences = _expand(task, start, end)
+
+    with _lock:
+        if _versions.get(task.id, 0) == version:
+            windows = _cache.setdefault(task.id, OrderedDict())
+            windows[key] = occurrences
+            while len(windows) > MAX_WINDOWS_PER_TASK:
+                windows.popitem(last=False)
+    return occurrences
+
+
+def invalidate_task(task_id: int):
+    """Drop every cached window for a task (call after it changes or is deleted)."""
+    with _lock:
+        _cache.pop(task_id, None)
+        _versions[task_id] = _versions.get(task_id, 0) + 1
+
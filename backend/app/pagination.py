@@ -0,0 +1,30 @@
+# pagination.py
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Sequence
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(sort: str, key: Sequence[Any]) -> str:
+    """Opaque cursor for keyset paging: the sort order plus the last row's sort key."""
+    values = [v.isoformat() if isinstance(v, datetime) else v for v in key]
+    raw = json.dumps({"s": sort, "k": values}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str) -> List[Any]:
+    """Sort key stored in `cursor`; raises InvalidCursor if it is malformed or from another sort order."""
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if data["s"] != sort or not isinstance(data["k"], list):
+            raise InvalidCursor("Cursor does not belong to this sort order")
+        # The only string keys are datetimes
+        return [datetime.fromisoformat(v) if isinstance(v, str) else v for v in data["k"]]
+    except InvalidCursor:
+        raise
+    except (ValueError, TypeError, KeyError) as e:
+        raise InvalidCursor(f"Invalid cursor: {e}")
@@ -0,0 +1,74 @@
+# printers.py
+import os
+from typing import Dict, List
+from printing import ThermalPrinter, PRINTER_IP, PRINTER_PORT
+
+# Named printers, e.g. "kitchen=192.168.2.34:9100,garage=192.168.2.35"
+# (empty => a single "default" printer at PRINTER_IP:PRINTER_PORT)
+PRINTERS = os.getenv("PRINTERS", "")
+# Category => printer(s), e.g. "kitchen=kitchen,shed=garage,garden=garage|kitchen,*=kitchen"
+# Several printers separated by | share the load; "*" is the fallback (default: first printer)
+PRINTER_ROUTES = os.getenv("PRINTER_ROUTES", "")
+
+DEFAULT_PRINTER = "default"
+FALLBACK_ROUTE = "*"
+
+
+def _entries(spec: str) -> List[str]:
+    return [e.strip() for e in spec.split(",") if e.strip()]
+
+
+def _parse_printers(spec: str) -> Dict[str, ThermalPrinter]:
+    printers = {}
+    for entry in _entries(spec):
+        name, _, address = entry.partition("=")
+        host, _, port = address.strip().partition(":")
+        if not name.strip() or not host:
+            raise ValueError(f"Invalid PRINTERS entry {entry!r}, expected name=host[:port]")
+        printers[name.strip()] = ThermalPrinter(host, int(port) if port else PRINTER_PORT)
+    return printers or {DEFAULT_PRINTER: ThermalPrinter(PRINTER_IP, PRINTER_PORT)}
+
+
+def _parse_routes(spec: str, printers: Dict[str, ThermalPrinter]) -> Dict[str, List[str]]:
+    routes = {}
+    for entry in _entries(spec):
+        category, _, names = entry.partition("=")
+        targets = [n.strip() for n in names.split("|") if n.strip()]
+        unknown = [n for n in targets if n not in printers]
+        if not category.strip() or not targets or unknown:
+            raise ValueError(f"Invalid PRINTER_ROUTES entry {entry!r} (known printers: {', '.join(printers)})")
+        routes[category.strip()] = targets
+    routes.setdefault(FALLBACK_ROUTE, [next(iter(printers))])
+    return routes
+
+
+class PrinterRegistry:
+    """Named printers plus the category => printers routing table."""
+
+    def __init__(self, printers: Dict[str, ThermalPrinter], routes: Dict[str, List[str]]):
+        self.printers = printers
+        self.routes = routes
+
+    @classmethod
+    def from_env(cls) -> "PrinterRegistry":
+        printers = _parse_printers(PRINTERS)
+        return cls(printers, _parse_routes(PRINTER_ROUTES, printers))
+
+    def names(self) -> List[str]:
+        return list(self.printers)
+
+    def get(self, name: str) -> ThermalPrinter:
+        return self.printers[name]
+
+    def candidates(self, category: str) -> List[str]:
+        """Printers a receipt of this category may go to."""
+        return self.routes.get(category) or self.routes[FALLBACK_ROUTE]
+
+    def describe(self) -> dict:
+        return {
+            "printers": {name: {"ip": p.host, "port": p.port} for name, p in self.printers.items()},
+            "routes": self.routes,
+        }
+
+
+registry = PrinterRegistry.from_env()
@@ -1,141 +1,217 @@
+import asyncio
 import os
-from escpos.printer import Network
+import select
+import socket
+import threading
+import time
+import layout
+import metrics
 from datetime import datetime
+from functools import lru_cache
+from typing import TYPE_CHECKING, Iterable, Optional, Tuple
 from zoneinfo import ZoneInfo
 
+if TYPE_CHECKING:
+    from escpos.printer import Network
+
 PRINTER_IP = os.getenv("PRINTER_IP", "192.168.2.34")
 PRINTER_PORT = int(os.getenv("PRINTER_PORT", "9100"))
 TZ = os.getenv("TZ", "Europe/Amsterdam")
+# How long an idle connection is kept open for the next receipt
+PRINTER_KEEPALIVE_SECONDS = float(os.getenv("PRINTER_KEEPALIVE_SECONDS", "15"))
+
+# Rendered receipt bodies kept in memory (keyed by title, description, category, layout)
+RECEIPT_CACHE_SIZE = int(os.getenv("RECEIPT_CACHE_SIZE", "256"))
+# Character size of receipt text (GS ! multipliers); the line width follows from it
+TEXT_WIDTH, TEXT_HEIGHT = 2, 1
+LINE_COLUMNS = layout.columns(TEXT_WIDTH)
+# Part of the render cache key: bump whenever the receipt layout below changes
+RECEIPT_LAYOUT = f"v2-{LINE_COLUMNS}col-{layout.RECEIPT_CODEPAGE}"
+
+# (title, description, category)
+Receipt = Tuple[str, str, str]
+
+# Category names (no emojis for thermal printer compatibility)
+CATEGORY_NAMES = {
+    'kitchen': 'KITCHEN',
+    'bathroom': 'BATHROOM',
+    'bedroom': 'BEDROOM', 
+    'living_room': 'LIVING ROOM',
+    'office': 'OFFICE',
+    'shed': 'SHED/GARAGE',
+    'garden': 'GARDEN/YARD',
+    'other': 'OTHER'
+}
 
 class ThermalPrinter:
-    def __init__(self, host: str = PRINTER_IP, port: int = PRINTER_PORT):
+    def __init__(self, host: str = PRINTER_IP, port: int = PRINTER_PORT,
+                 keepalive_seconds: float = PRINTER_KEEPALIVE_SECONDS):
         self.host = host
         self.port = port
+        self.keepalive_seconds = keepalive_seconds
+        self._conn: Optional["Network"] = None
+        self._last_used = 0.0
+        self._lock = threading.Lock()
 
     def print_task(self, title: str, description: str = "", category: str = "other"):
         """Clean thermal printer compatible receipt with category indicators."""
-        p = Network(self.host, port=self.port, timeout=5)
-        
-        # Category names (no emojis for thermal printer compatibility)
-        category_names = {
-            'kitchen': 'KITCHEN',
-            'bathroom': 'BATHROOM',
-            'bedroom': 'BEDROOM', 
-            'living_room': 'LIVING ROOM',
-            'office': 'OFFICE',
-            'shed': 'SHED/GARAGE',
-            'garden': 'GARDEN/YARD',
-            'other': 'OTHER'
-        }
-        
-        category_name = category_names.get(category, 'OTHER')
-        ts = datetime.now(ZoneInfo(TZ)).strftime("%d-%m-%Y %H:%M")
-        
+        self.print_many([(title, description, category)])
+
+    def print_many(self, receipts: Iterable[Receipt]):
+        """Print several receipts over one TCP session, reconnecting once if it drops."""
+        pending = list(receipts)
+        with self._lock:
+            retried = False
+            while pending:
+                with metrics.print_phase.time(host=self.host, phase="connect"):
+                    p = self._connection()
+                with metrics.print_phase.time(host=self.host, phase="render"):
+                    data = self.render(*pending[0])
+                try:
+                    # One complete receipt (cut included) per sendall instead of a write per set()/text()
+                    with metrics.print_phase.time(host=self.host, phase="write"):
+                        p.device.sendall(data)
+                except OSError:
+                    self._drop()
+                    if retried:
+                        raise
+                    # A reused socket can die between health check and write; try a fresh one
+                    retried = True
+                    continue
+                pending.pop(0)
+                self._last_used = time.monotonic()
+
+    def close(self):
+        with self._lock:
+            self._drop()
+
+    def close_if_idle(self):
+        """Release the connection once it has been idle longer than the keep-alive window."""
+        if self._conn is None or not self._lock.acquire(blocking=False):
+            return
         try:
-            # Set smaller text size to save paper
-            p.set(align="left", width=2, height=1)  # Slightly smaller but still readable
-            
-            # Category header (bold and centered)
-            p.set(align="center", bold=True, width=2, height=1)
-            p.text(f"[ {category_name} ]\n")
-            p.set(bold=False, width=2, height=1)
-            
-            # Separator line
-            p.set(align="left", width=2, height=1)
-            p.text("=" * 24 + "\n")
-            
-            # Title (bold and centered) - use better wrapping
-            p.set(align="center", bold=True, width=2, height=1)
-            title_lines = self._wrap_text_smart(title, 24)  # Match separator width
-            for line in title_lines:
-                p.text(f"{line}\n")
-            p.set(bold=False, width=2, height=1)
-            
-            # Separator line  
-            p.set(align="left", width=2, height=1)
-            p.text("=" * 24 + "\n")
-            
-            # Timestamp
-            p.set(align="center", width=2, height=1)
-            p.text(f"Time: {ts}\n")
-            
-            # Description (if provided) - use better wrapping
-            if description:
-                p.text("\n")
-                p.set(align="center", width=2, height=1)
-                desc_lines = self._wrap_text_smart(description, 24)  # Match separator width
-                for i, line in enumerate(desc_lines):
-                    if i == len(desc_lines) - 1:  # Last line
-                        p.text(f"{line}")
-                    else:
-                        p.text(f"{line}\n")
-            
-            # Cut
-            p.cut()
+            if self._conn is not None and time.monotonic() - self._last_used >= self.keepalive_seconds:
+                self._drop()
         finally:
-            try:
-                p.close()
-            except Exception:
-                pass
+            self._lock.release()
+
+    def _connection(self) -> "Network":
+        if self._conn is not None and self._healthy():
+            return self._conn
+        self._drop()
+        # escpos loads its printer capability database on import (~0.4s); only pay for it once printing
+        from escpos.printer import Network
+
+        p = Network(self.host, port=self.port, timeout=5)
+        p.open()
+        p.device.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        self._conn = p
+        self._last_used = time.monotonic()
+        return p
+
+    def _healthy(self) -> bool:
+        if time.monotonic() - self._last_used >= self.keepalive_seconds:
+            return False
+        sock = self._conn.device
+        try:
+            readable, _, _ = select.select([sock], [], [], 0)
+            # A readable socket with nothing to read has been closed by the printer
+            if readable and not sock.recv(1, socket.MSG_PEEK):
+                return False
+        except (OSError, ValueError):
+            return False
+        return True
+
+    def _drop(self):
+        if self._conn is None:
+            return
+        try:
+            self._conn.close()
+        except Exception:
+            pass
+        self._conn = None
+
+    def render(self, title: str, description: str = "", category: str = "other",
+               ts: Optional[str] = None) -> bytes:
+        """Complete ESC/POS byte stream for one receipt; only the timestamp is patched per print."""
+        head, tail = _render_parts(title, description, category, RECEIPT_LAYOUT)
+        if ts is None:
+            ts = datetime.now(ZoneInfo(TZ)).strftime("%d-%m-%Y %H:%M")
+        return head + ts.encode("ascii") + tail
+
+
+@lru_cache(maxsize=RECEIPT_CACHE_SIZE)
+def _render_parts(title: str, description: str, category: str, layout: str) -> Tuple[bytes, bytes]:
+    """Render a receipt into the bytes before and after its timestamp."""
+    from escpos.printer import Dummy
+
+    p = Dummy()
+    _write_header(p, title, category)
+    head = p.output
+    p.clear()
+    _write_body(p, description)
+    return head, p.output
+
+
+def _text(p, text: str):
+    """Write text encoded for the printer's codepage (escpos would pick its own per call)."""
+    p._raw(layout.encode(text))
+
+
+def _write_header(p, title: str, category: str):
+    """Everything up to the timestamp value: category, title and the "Time: " label."""
+    category_name = CATEGORY_NAMES.get(category, 'OTHER')
+    
+    # Codepage once per receipt; double-width text, so LINE_COLUMNS characters per line
+    p._raw(layout.select_codepage())
+    p.set(align="left", custom_size=True, width=TEXT_WIDTH, height=TEXT_HEIGHT)
+    
+    # Category header (bold and centered)
+    p.set(align="center", bold=True)
+    _text(p, f"[ {category_name} ]\n")
+    p.set(bold=False)
+    
+    # Separator line
+    p.set(align="left")
+    _text(p, "=" * LINE_COLUMNS + "\n")
     
-    def _wrap_text(self, text: str, width: int) -> list[str]:
-        """Helper function to wrap text to fit within specified width."""
-        words = text.split()
-        lines = []
-        current_line = ""
-        
-        for word in words:
-            if len(current_line + word + " ") <= width:
-                current_line += word + " "
-            else:
-                if current_line:
-                    lines.append(current_line.rstrip())
-                current_line = word + " "
-        
-        if current_line:
-            lines.append(current_line.rstrip())
-        
-        return lines if lines else [""]
+    # Title (bold and centered)
+    p.set(align="center", bold=True)
+    for line in layout.wrap(title, LINE_COLUMNS):
+        _text(p, f"{line}\n")
+    p.set(bold=False)
     
-    def _wrap_text_smart(self, text: str, width: int) -> list[str]:
-        """Smart text wrapping that avoids breaking words and handles Dutch text better."""
-        words = text.split()
-        lines = []
-        current_line = ""
-        
-        for word in words:
-            # Check if adding this word would exceed the width
-            test_line = current_line + word if not current_line else current_line + " " + word
-            
-            if len(test_line) <= width:
-                current_line = test_line
-            else:
-                # Current line is full, start a new one
-                if current_line:
-                    lines.append(current_line)
-                
-                # Handle very long words that don't fit on one line
-                if len(word) > width:
-                    # Break long words at appropriate points (avoid breaking in middle of common Dutch patterns)
-                    while len(word) > width:
-                        # Try to find a good break point (after common prefixes/before suffixes)
-                        break_point = width
-                        
-                        # Look for good break points in Dutch words
-                        for i in range(min(width, len(word))):
-                            char = word[i]
-                            # Break after common Dutch prefixes or before suffixes
-                            if char in 'aeiou' and i > 2 and i < len(word) - 2:
-                                break_point = i + 1
-                                break
-                        
-                        lines.append(word[:break_point])
-                        word = word[break_point:]
-                    current_line = word
-                else:
-                    current_line = word
-        
-        if current_line:
-            lines.append(current_line)
-        
-        return lines if lines else [""]
\ No newline at end of file
+    # Separator line  
+    p.set(align="left")
+    _text(p, "=" * LINE_COLUMNS + "\n")
+    
+    # Timestamp (value is patched in at send time)
+    p.set(align="center")
+    _text(p, "Time: ")
+
+
+def _write_body(p, description: str):
+    """Everything after the timestamp value: description and cut."""
+    _text(p, "\n")
+    
+    # Description (if provided)
+    if description:
+        p.set(align="center")
+        _text(p, "\n" + "\n".join(layout.wrap(description, LINE_COLUMNS)))
+    
+    # Cut
+    p.cut()
+
+
+async def send_raw(host: str, port: int, data: bytes, timeout: float = 5.0):
+    """Write raw ESC/POS bytes over asyncio streams, so a slow printer holds no thread."""
+    reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    try:
+        writer.write(data)
+        await asyncio.wait_for(writer.drain(), timeout)
+    finally:
+        writer.close()
+        try:
+            await asyncio.wait_for(writer.wait_closed(), timeout)
+        except (OSError, asyncio.TimeoutError):
+            pass
@@ -0,0 +1,297 @@
+# rrules.py
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime, time, timedelta
+from typing import List, Optional, Union
+from dateutil.rrule import rrule, rruleset, rrulestr, YEARLY, MONTHLY, WEEKLY, DAILY, HOURLY, MINUTELY, SECONDLY
+from utils import to_aware
+
+RRULE_CACHE_SIZE = int(os.getenv("RRULE_CACHE_SIZE", "512"))
+
+
+class RRuleCache:
+    """Bounded LRU of compiled rules keyed by (rrule string, start_at, until)."""
+
+    def __init__(self, maxsize: int = RRULE_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[tuple, Union[rrule, rruleset]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(rrule_str: str, start_at: datetime, until: Optional[datetime]) -> tuple:
+        # DB rows come back naive, API payloads aware: normalize so both hit
+        return (rrule_str, to_aware(start_at), to_aware(until))
+
+    def get(self, rrule_str: str, start_at: datetime, until: Optional[datetime] = None) -> Union[rrule, rruleset]:
+        key = self._key(rrule_str, start_at, until)
+        with self._lock:
+            rule = self._entries.get(key)
+            if rule is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return rule
+            self.misses += 1
+
+        rule = _compile(*key)
+
+        with self._lock:
+            self._entries[key] = rule
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return rule
+
+    def evict(self, rrule_str: str, start_at: datetime, until: Optional[datetime] = None):
+        with self._lock:
+            if self._entries.pop(self._key(rrule_str, start_at, until), None) is not None:
+                self.evictions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "parsed_rules": len(_templates),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / total, 4) if total else None,
+            }
+
+
+# Parsed rules per RRULE string. Tasks rarely share a start_at, but they do share a
+# handful of rule strings, so each string is parsed once and re-anchored per task.
+_templates: "OrderedDict[str, rrule]" = OrderedDict()
+# Re-anchored rules per (RRULE string, shape): tasks of one shape differ only in dtstart
+_shapes: "OrderedDict[tuple, rrule]" = OrderedDict()
+_SHAPES_MAX = 8 * RRULE_CACHE_SIZE
+_templates_lock = threading.Lock()
+
+
+def _shape(template: rrule, start_at: datetime) -> tuple:
+    """
+    The parts of dtstart that dateutil builds a rule from besides dtstart itself: the
+    zone, the time of day, and the month, day or weekday wherever the rule leaves them
+    to be taken from dtstart (those are recorded as None in _original_rule).
+    """
+    derived = template._original_rule
+    return (
+        start_at.tzinfo,
+        start_at.time(),
+        start_at.month if derived.get("bymonth", ()) is None else None,
+        start_at.day if derived.get("bymonthday", ()) is None else None,
+        start_at.weekday() if derived.get("byweekday", ()) is None else None,
+    )
+
+
+def _moved(rule: rrule, dtstart: Optional[datetime] = None, until: Optional[datetime] = None) -> rrule:
+    """
+    A copy of `rule` with a new dtstart and/or until, without rrule.replace() rebuilding
+    and re-validating every rule part. Only for a dtstart that dateutil would derive the
+    same parts from: one of the same shape, or a whole number of periods on.
+    """
+    moved = rrule.__new__(rrule)
+    moved.__dict__.update(rule.__dict__)
+    if dtstart is not None:
+        moved._dtstart = dtstart
+    if until is not None:
+        moved._until = until
+    return moved
+
+
+def _compile(rrule_str: str, start_at: datetime, until: Optional[datetime]) -> Union[rrule, rruleset]:
+    # As rrule() does; a dtstart of the same shape then yields the same rule
+    start_at = start_at.replace(microsecond=0)
+    with _templates_lock:
+        template = _templates.get(rrule_str)
+    if template is not None:
+        shape = (rrule_str,) + _shape(template, start_at)
+        with _templates_lock:
+            anchored = _shapes.get(shape)
+        if anchored is not None:
+            rule = _moved(anchored, dtstart=start_at)
+        else:
+            rule = template.replace(dtstart=start_at)
+            # Worked out once per shape; every copy made from it carries the result along
+            _period_offsets(rule)
+            with _templates_lock:
+                _shapes[shape] = rule
+                while len(_shapes) > _SHAPES_MAX:
+                    _shapes.popitem(last=False)
+    else:
+        rule = rrulestr(rrule_str, dtstart=start_at)
+        # Only a bare RRULE value can be re-anchored; DTSTART/RDATE/EXDATE lines can't
+        if isinstance(rule, rrule) and ":" not in rrule_str:
+            with _templates_lock:
+                _templates[rrule_str] = rule
+                while len(_templates) > RRULE_CACHE_SIZE:
+                    _templates.popitem(last=False)
+    # Fold Task.until into the rule itself, unless the RRULE already ends earlier
+    # or is bounded by COUNT (dateutil forbids UNTIL and COUNT together)
+    if until and isinstance(rule, rrule) and rule._count is None:
+        if rule._until is None or until < rule._until:
+            rule = _moved(rule, until=until)
+    return rule
+
+
+# Frequencies whose occurrence pattern repeats every `interval` fixed-length periods
+_PERIODS = {
+    WEEKLY: timedelta(weeks=1),
+    DAILY: timedelta(days=1),
+    HOURLY: timedelta(hours=1),
+    MINUTELY: timedelta(minutes=1),
+    SECONDLY: timedelta(seconds=1),
+}
+
+
+def fast_forward(rule: Union[rrule, rruleset], cursor: datetime) -> Union[rrule, rruleset]:
+    """
+    Return an equivalent rule whose dtstart is moved up to just before `cursor`.
+    dateutil always iterates from dtstart, so a daily rule started a year ago walks
+    365 dates before it can answer after(now). Without COUNT, shifting dtstart by
+    whole multiples of the rule's period keeps every occurrence after the new
+    dtstart unchanged. Anything else is returned as-is.
+    """
+    if not isinstance(rule, rrule) or rule._count is not None:
+        return rule
+    dtstart = rule._dtstart
+    # Wall-clock arithmetic, matching how dateutil steps through local times
+    local_cursor = cursor.astimezone(dtstart.tzinfo).replace(tzinfo=None)
+
+    period = _PERIODS.get(rule._freq)
+    if period is not None:
+        step = period * rule._interval
+        # Stay one step behind the cursor so DST shifts can never skip an occurrence
+        periods = (local_cursor - dtstart.replace(tzinfo=None)) // step - 1
+        if periods <= 0:
+            return rule
+        return _moved(rule, dtstart=dtstart + step * periods)
+
+    if rule._freq not in (MONTHLY, YEARLY):
+        return rule
+    months = (local_cursor.year - dtstart.year) * 12 + local_cursor.month - dtstart.month
+    step = rule._interval * (12 if rule._freq == YEARLY else 1)
+    periods = months // step - 1
+    if periods <= 0:
+        return rule
+    # Restart on the 1st of the shifted month (the original day may not exist there). The
+    # day and month dateutil derived from the original dtstart stay in the copied rule
+    month_index = dtstart.year * 12 + dtstart.month - 1 + step * periods
+    return _moved(rule, dtstart=dtstart.replace(year=month_index // 12, month=month_index % 12 + 1, day=1))
+
+
+# BYxxx parts that only pick times within one period, so the rule still repeats every
+# `interval` periods (BYHOUR on an hourly rule, say, repeats per day instead)
+_IN_PERIOD = {
+    WEEKLY: ("byweekday", "byhour", "byminute", "bysecond"),
+    DAILY: ("byhour", "byminute", "bysecond"),
+    HOURLY: ("byminute", "bysecond"),
+    MINUTELY: ("bysecond",),
+    SECONDLY: (),
+}
+
+
+def _period_offsets(rule: Union[rrule, rruleset]) -> Optional[List[timedelta]]:
+    """
+    For a rule that repeats every `interval` periods: the offsets of its occurrences from
+    the start of a period, ascending. None for any other rule. They only depend on the
+    rule's shape, so they are kept on the rule and carried along by _moved() copies.
+    """
+    if not isinstance(rule, rrule):
+        return None
+    try:
+        return rule._offsets
+    except AttributeError:
+        pass
+    offsets = None
+    allowed = _IN_PERIOD.get(rule._freq)
+    if (allowed is not None and rule._count is None and rule._bysetpos is None and not rule._bynweekday
+            and not any(v for k, v in rule._original_rule.items() if k not in allowed)):
+        if rule._freq in (WEEKLY, DAILY):
+            days = [(weekday - rule._wkst) % 7 for weekday in rule._byweekday] if rule._freq == WEEKLY else [0]
+            offsets = [timedelta(days=d, hours=t.hour, minutes=t.minute, seconds=t.second)
+                       for d in days for t in rule._timeset]
+        elif rule._freq == HOURLY:
+            offsets = [timedelta(minutes=m, seconds=sec) for m in rule._byminute for sec in rule._bysecond]
+        elif rule._freq == MINUTELY:
+            offsets = [timedelta(seconds=sec) for sec in rule._bysecond]
+        else:
+            offsets = [timedelta(0)]
+        offsets = sorted(offsets) or None
+    rule._offsets = offsets
+    return offsets
+
+
+def _period_start(rule: rrule, start: datetime) -> datetime:
+    """The (naive, wall-clock) start of the period holding `start`, the rule's naive dtstart."""
+    if rule._freq == WEEKLY:
+        # Weeks begin on WKST; dateutil counts `interval` weeks from dtstart's
+        return datetime.combine(start.date() - timedelta(days=(start.weekday() - rule._wkst) % 7), time())
+    if rule._freq == DAILY:
+        return datetime.combine(start.date(), time())
+    if rule._freq == HOURLY:
+        return start.replace(minute=0, second=0)
+    if rule._freq == MINUTELY:
+        return start.replace(second=0)
+    return start
+
+
+# More than any UTC offset change, so an earlier wall-clock time is an earlier instant
+_MAX_DST_SHIFT = timedelta(hours=3)
+
+
+def next_after(rule: Union[rrule, rruleset], cursor: datetime) -> Optional[datetime]:
+    """
+    Equivalent to rule.after(cursor), but cheap for the common cases.
+    A rule without COUNT whose BYxxx parts stay within one period (FREQ=DAILY,
+    FREQ=WEEKLY;BYDAY=MO,WE,FR, FREQ=HOURLY;INTERVAL=4, ...) fires at the same offsets
+    every `interval` periods, so the next occurrence is computed directly; other rules
+    are fast-forwarded first.
+    """
+    offsets = _period_offsets(rule)
+    if offsets is None:
+        return fast_forward(rule, cursor).after(cursor, inc=False)
+    tz = rule._dtstart.tzinfo
+    start = rule._dtstart.replace(tzinfo=None)
+    period_start = _period_start(rule, start)
+    step = _PERIODS[rule._freq] * rule._interval
+    local_cursor = cursor.astimezone(tz).replace(tzinfo=None)
+    # Start a period early: around DST a wall-clock time before the cursor's can still be after it
+    n = max((local_cursor - period_start) // step - 1, 0)
+    skip_before = local_cursor - _MAX_DST_SHIFT
+    # In dateutil's order and with its checks: UNTIL ends the rule, occurrences start at
+    # dtstart (compared in wall-clock time), and after() compares like `>` does here
+    while True:
+        base = period_start + step * n
+        for offset in offsets:
+            wall = base + offset
+            if wall < skip_before:
+                continue
+            nxt = wall.replace(tzinfo=tz)
+            if rule._until and nxt > rule._until:
+                return None
+            if wall >= start and nxt > cursor:
+                return nxt
+        n += 1
+
+
+_cache = RRuleCache()
+
+
+def compile_rrule(rrule_str: str, start_at: datetime, until: Optional[datetime] = None) -> Union[rrule, rruleset]:
+    """Return the compiled rule for a task's recurrence, reusing a cached one if possible."""
+    return _cache.get(rrule_str, start_at, until)
+
+
+def evict(rrule_str: str, start_at: datetime, until: Optional[datetime] = None):
+    _cache.evict(rrule_str, start_at, until)
+
+
+def cache_stats() -> dict:
+    return _cache.stats()
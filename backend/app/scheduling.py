@@ -1,16 +1,44 @@
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.date import DateTrigger
-from dateutil.rrule import rrulestr, rrule
-from dateutil.tz import gettz
-from datetime import datetime
-from typing import Optional
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+from zoneinfo import ZoneInfo
 from models import Task
-from crud import update_task, list_blackout_periods
-from printing import ThermalPrinter
+from crud import (
+    update_task, iter_active_schedules, set_next_runs, list_due_tasks, get_tasks, mark_fired, count_scheduled_tasks,
+)
+from spooler import spooler, SpoolFullError
 from utils import now_tz, TZ, to_aware
+from rrules import compile_rrule, next_after
+import blackouts
+import metrics
+import events
+import firelog
+from duequeue import DueQueue
 
-printer = ThermalPrinter()
-scheduler = BackgroundScheduler(timezone=gettz(TZ))
+scheduler = BackgroundScheduler(timezone=ZoneInfo(TZ))
+
+# "jobs": one APScheduler DateTrigger job per task (default)
+# "poll": a single job polls the indexed next_run_at column for due tasks
+# "heap": an in-memory due queue fires everything due in the same tick as one batch
+SCHEDULER_MODE = os.getenv("SCHEDULER_MODE", "jobs").lower()
+POLL_INTERVAL_SECONDS = float(os.getenv("POLL_INTERVAL_SECONDS", "5"))
+# Largest batch fired at once (poll and heap modes)
+POLL_BATCH_SIZE = int(os.getenv("POLL_BATCH_SIZE", "500"))
+SCHEDULER_TICK_SECONDS = float(os.getenv("SCHEDULER_TICK_SECONDS", "1"))
+
+last_rehydration: Optional[dict] = None
+
+# Set while another process is the scheduler leader (see leader.py): nothing fires here
+# and schedule_task() only records next_run_at, which the leader picks up
+_standby = False
+# Serializes fires in this process, so a catch-up never races a job for the same task
+_fire_lock = threading.Lock()
+# Tasks overdue by more than this are fired by the catch-up instead of their own job
+_CATCH_UP_GRACE = timedelta(seconds=max(2 * SCHEDULER_TICK_SECONDS, 2))
 
 
 def _next_occurrence(task: Task, after: Optional[datetime] = None) -> Optional[datetime]:
@@ -25,14 +53,28 @@ def _next_occurrence(task: Task, after: Optional[datetime] = None) -> Optional[d
     
     if not task.rrule:
         return base if base > now_tz() else None
-    rule = rrulestr(task.rrule, dtstart=base)
-    nxt = rule.after(cursor, inc=False)
+    rule = compile_rrule(task.rrule, task.start_at, task.until)
+    nxt = next_after(rule, cursor)
+    # until is folded into the compiled rule, except for COUNT-bounded rules
+    if nxt and task.until and nxt > to_aware(task.until):
+        return None
     return nxt
 
 
 def schedule_task(task: Task):
     if not task.is_active:
         return
+
+    next_run = _next_occurrence(task)
+    if to_aware(task.next_run_at) != next_run:
+        set_next_runs([(task.id, next_run)])
+        task.next_run_at = next_run
+    if SCHEDULER_MODE == "poll" or _standby:
+        # The due-task poller (or the leader's catch-up) picks it up from next_run_at
+        return
+    if SCHEDULER_MODE == "heap":
+        due_queue.push(task.id, next_run)
+        return
     
     # Remove any existing jobs for this task to prevent duplicates
     job_id = f"task_{task.id}"
@@ -40,7 +82,6 @@ def schedule_task(task: Task):
     if existing_job:
         scheduler.remove_job(job_id)
     
-    next_run = _next_occurrence(task)
     if not next_run:
         return
     
@@ -48,42 +89,329 @@ def schedule_task(task: Task):
     scheduler.add_job(_run_and_reschedule, DateTrigger(run_date=next_run), args=[task.id], id=job_id)
 
 
+def _plan(rows, now: datetime, planned: list) -> list:
+    """
+    Compute the next run of each schedule row, appending (next_run, task_id) to
+    `planned`; returns the (task_id, next_run) pairs whose next_run_at changed.
+    """
+    changed = []
+    for task in rows:
+        # Never replay fires missed while we were down; resume from now
+        cursor = now
+        if task.last_fired_at and to_aware(task.last_fired_at) > now:
+            cursor = task.last_fired_at
+        try:
+            next_run = _next_occurrence(task, after=cursor)
+        except (ValueError, TypeError) as e:
+            print(f"Skipping task {task.id} with invalid RRULE {task.rrule!r}: {e}")
+            continue
+        if to_aware(task.next_run_at) != next_run:
+            changed.append((task.id, next_run))
+        if next_run:
+            planned.append((next_run, task.id))
+    return changed
+
+
+def _register(planned: list):
+    if SCHEDULER_MODE == "poll":
+        # The due-task poller picks them up from next_run_at
+        return
+    if SCHEDULER_MODE == "heap":
+        due_queue.push_many(planned)
+        return
+    # In run-date order every insert lands at the tail of the job store
+    planned.sort()
+    for next_run, task_id in planned:
+        scheduler.add_job(
+            _run_and_reschedule, DateTrigger(run_date=next_run), args=[task_id],
+            id=f"task_{task_id}", replace_existing=True,
+            # Already known, so APScheduler needn't ask the trigger again per job
+            next_run_time=next_run,
+        )
+
+
+def schedule_tasks(rows) -> int:
+    """
+    Schedule many tasks in one pass: next runs are computed up front, written back
+    with a single bulk UPDATE and the jobs added in run-date order. `rows` need the
+    same attributes as iter_active_schedules() rows. Returns how many got a next run.
+    """
+    planned = []
+    set_next_runs(_plan(rows, now_tz(), planned))
+    if not _standby:
+        _register(planned)
+    return len(planned)
+
+
+def rehydrate(batch_size: int = 5000) -> dict:
+    """
+    Re-register a job for every active task, e.g. after a restart.
+    Tasks are streamed in batches and their next runs computed up front; the jobs
+    are then added in run-date order in one pass. Called before start(), the adds
+    only queue up and the scheduler registers them all at once when it starts.
+    Changed next_run_at values are written back per batch. In poll mode there are
+    no jobs to register, and only tasks whose next_run_at is missing or has passed
+    while we were down need recomputing, so restart cost stays flat.
+    """
+    global last_rehydration
+    started = time.perf_counter()
+    now = now_tz()
+    poll_mode = SCHEDULER_MODE == "poll"
+
+    planned = []
+    tasks = 0
+    for batch in iter_active_schedules(batch_size, stale_before=now if poll_mode else None):
+        tasks += len(batch)
+        set_next_runs(_plan(batch, now, planned))
+    computed = time.perf_counter()
+    _register(planned)
+    finished = time.perf_counter()
+
+    last_rehydration = {
+        "mode": SCHEDULER_MODE,
+        "tasks": tasks,
+        "scheduled": len(planned),
+        "compute_seconds": round(computed - started, 3),
+        "register_seconds": round(finished - computed, 3),
+        "total_seconds": round(finished - started, 3),
+    }
+    print(f"✅ Rehydrated {len(planned)}/{tasks} active tasks in {last_rehydration['total_seconds']}s")
+    return last_rehydration
+
+
 def _is_in_blackout_period(check_time: datetime) -> bool:
     """Check if the given datetime falls within any active blackout period"""
-    blackout_periods = list_blackout_periods()
-    for period in blackout_periods:
-        if not period.is_active:
-            continue
-        start = to_aware(period.start_date)
-        end = to_aware(period.end_date)
-        if start <= check_time <= end:
-            return True
-    return False
+    # Blackouts may have been edited through another worker
+    blackouts.sync()
+    return blackouts.is_blacked_out(check_time)
+
+
+def _observe_lag(task: Task, started: datetime):
+    """Record how late a task fired compared to its planned next_run_at."""
+    if task.next_run_at is not None:
+        lag = (started - to_aware(task.next_run_at)).total_seconds()
+        metrics.scheduler_lag.observe(max(lag, 0.0), mode=SCHEDULER_MODE)
+
+
+def _fire(task: Task, current_time: datetime) -> Optional[Task]:
+    """Queue a due task's receipt (unless blacked out) and advance it; returns the updated task."""
+    # Check if we're in a blackout period; if so skip printing but still advance
+    blacked_out = _is_in_blackout_period(current_time)
+    job_id = None
+    # A queued receipt is logged by the spooler once it has printed (or given up)
+    outcome = "skipped_blackout" if blacked_out else None if task.auto_print else "no_print"
+    if outcome is None:
+        # Hand off to the spooler; printer I/O and retries happen on its worker thread
+        try:
+            job_id = spooler.submit(
+                task.title, task.description, task.category, task_id=task.id, planned_at=task.next_run_at,
+            ).id
+        except SpoolFullError as e:
+            # Still advance, otherwise a backed-up printer would stall the task for good
+            print(f"Dropped receipt for task {task.id}: {e}")
+            outcome = "dropped"
+    if outcome:
+        firelog.record(task.id, current_time, outcome, planned_at=task.next_run_at)
+    # last_fired_at and next_run_at move together in one transaction
+    next_run = _next_occurrence(task, after=current_time)
+    updated = update_task(task.id, last_fired_at=current_time, next_run_at=next_run)
+    events.publish("task.fired", {
+        "id": task.id, "fired_at": current_time, "next_run_at": next_run,
+        "blacked_out": blacked_out, "print_job_id": job_id,
+    })
+    return updated
+
+
+def _is_due(task: Task, now: datetime) -> bool:
+    # A job or queue entry outlives edits made by other workers; next_run_at is the truth
+    return task.next_run_at is not None and to_aware(task.next_run_at) <= now + timedelta(seconds=1)
 
 
 def _run_and_reschedule(task_id: int):
     from crud import get_task  # local import to avoid cycles
-    task = get_task(task_id)
-    if not task or not task.is_active:
-        return
-    
-    current_time = now_tz()
-    
-    # Check if we're in a blackout period
-    if _is_in_blackout_period(current_time):
-        # Skip printing but still update last_fired_at and reschedule
-        update_task(task.id, last_fired_at=current_time)
-        schedule_task(task)
-        return
-    
-    if task.auto_print:
-        printer.print_task(task.title, task.description, task.category)
-    # update last fired
-    update_task(task.id, last_fired_at=current_time)
-    # schedule next
-    schedule_task(task)
+    with _fire_lock:
+        if _standby:
+            return
+        started = now_tz()
+        task = get_task(task_id)
+        if not task or not task.is_active:
+            return
+        if not _is_due(task, started):
+            # Rescheduled since this job was added (or already fired by the catch-up)
+            schedule_task(task)
+            return
+        _observe_lag(task, started)
+
+        updated = _fire(task, now_tz())
+        # schedule next
+        if updated:
+            schedule_task(updated)
+
+
+def _fire_batch(tasks: List[Task], current_time: datetime) -> List[Tuple[int, Optional[datetime]]]:
+    """
+    Fire several due tasks together, as _fire() does one: a single blackout check, one
+    spooler hand-off for all receipts and one bulk last_fired_at/next_run_at update.
+    Returns each task's (id, next run).
+    """
+    for task in tasks:
+        _observe_lag(task, current_time)
+    blacked_out = _is_in_blackout_period(current_time)
+    queued = 0
+    if blacked_out:
+        for task in tasks:
+            firelog.record(task.id, current_time, "skipped_blackout", planned_at=task.next_run_at)
+    else:
+        printing = [t for t in tasks if t.auto_print]
+        receipts = [(t.title, t.description, t.category, t.id, t.next_run_at) for t in printing]
+        queued = spooler.submit_many(receipts) if receipts else 0
+        if queued < len(receipts):
+            # Still advance, otherwise a backed-up printer would stall the tasks for good
+            print(f"Dropped {len(receipts) - queued} receipt(s): print queue is full")
+        # submit_many() queues a prefix of the receipts and drops the rest
+        for task in printing[queued:]:
+            firelog.record(task.id, current_time, "dropped", planned_at=task.next_run_at)
+        for task in tasks:
+            if not task.auto_print:
+                firelog.record(task.id, current_time, "no_print", planned_at=task.next_run_at)
+    next_runs = []
+    for task in tasks:
+        try:
+            next_runs.append((task.id, _next_occurrence(task, after=current_time)))
+        except (ValueError, TypeError) as e:
+            print(f"Skipping task {task.id} with invalid RRULE {task.rrule!r}: {e}")
+            next_runs.append((task.id, None))
+    mark_fired(current_time, next_runs)
+    events.publish("tasks.fired", {
+        "fired_at": current_time, "blacked_out": blacked_out, "print_jobs_queued": queued,
+        "tasks": [{"id": task_id, "next_run_at": next_run} for task_id, next_run in next_runs],
+    })
+    return next_runs
+
+
+def _poll_due():
+    """Fire every task whose next_run_at has passed (poll mode)."""
+    with _fire_lock:
+        if _standby:
+            return
+        current_time = now_tz()
+        tasks = list_due_tasks(current_time, POLL_BATCH_SIZE)
+        if tasks:
+            _fire_batch(tasks, current_time)
+
+
+def _fire_due(task_ids: List[int]):
+    """Fire one tick's worth of tasks from the due queue (heap mode) and queue their next runs."""
+    for i in range(0, len(task_ids), POLL_BATCH_SIZE):
+        with _fire_lock:
+            if _standby:
+                return
+            now = now_tz()
+            # Deleted, deactivated or since rescheduled tasks may still have an entry; the fresh read drops them
+            tasks = [t for t in get_tasks(task_ids[i:i + POLL_BATCH_SIZE]) if t.is_active]
+            due_queue.push_many([(to_aware(t.next_run_at), t.id) for t in tasks if t.next_run_at and not _is_due(t, now)])
+            tasks = [t for t in tasks if _is_due(t, now)]
+            if not tasks:
+                continue
+            next_runs = _fire_batch(tasks, now)
+            due_queue.push_many([(next_run, task_id) for task_id, next_run in next_runs if next_run])
+
+
+def fire_missed(window_seconds: float) -> int:
+    """
+    Fire tasks that fell due in the last `window_seconds`, e.g. while a dead leader's
+    lease ran out. Call before rehydrate(), which skips anything missed before that.
+    """
+    with _fire_lock:
+        now = now_tz()
+        since = now - timedelta(seconds=window_seconds)
+        tasks = [t for t in list_due_tasks(now, POLL_BATCH_SIZE) if to_aware(t.next_run_at) >= since]
+        if tasks:
+            print(f"Firing {len(tasks)} task(s) missed during the leader handover")
+            _fire_batch(tasks, now)
+        return len(tasks)
+
+
+def _is_registered(task: Task) -> bool:
+    next_run = to_aware(task.next_run_at)
+    if SCHEDULER_MODE == "heap":
+        return due_queue.scheduled_at(task.id) == next_run.timestamp()
+    job = scheduler.get_job(f"task_{task.id}")
+    return job is not None and job.next_run_time == next_run
+
+
+def _catch_up():
+    """
+    jobs and heap modes: pick up next_run_at changes this process didn't make, i.e.
+    tasks created or edited through another worker, or jobs APScheduler skipped as
+    misfired. Overdue tasks are fired now, those due before the next check registered.
+    """
+    with _fire_lock:
+        if _standby:
+            return
+        now = now_tz()
+        tasks = list_due_tasks(now + timedelta(seconds=2 * POLL_INTERVAL_SECONDS), POLL_BATCH_SIZE)
+        overdue = [t for t in tasks if to_aware(t.next_run_at) < now - _CATCH_UP_GRACE]
+        if overdue:
+            print(f"Catching up on {len(overdue)} overdue task(s)")
+            next_runs = _fire_batch(overdue, now)
+            _register([(next_run, task_id) for task_id, next_run in next_runs if next_run])
+        missing = [t for t in tasks if to_aware(t.next_run_at) >= now - _CATCH_UP_GRACE and not _is_registered(t)]
+        _register([(to_aware(t.next_run_at), t.id) for t in missing])
+
+
+due_queue = DueQueue(_fire_due, SCHEDULER_TICK_SECONDS)
+
+
+def scheduled_count() -> int:
+    """Tasks waiting to fire: APScheduler jobs, due queue entries or (poll) upcoming rows."""
+    if SCHEDULER_MODE == "heap":
+        return len(due_queue)
+    if SCHEDULER_MODE == "poll":
+        return count_scheduled_tasks()
+    return len(scheduler.get_jobs())
+
+
+metrics.Gauge("receipttasker_scheduled_tasks", "Tasks waiting to fire in the scheduler", scheduled_count)
 
 
 def start():
-    if not scheduler.running:
-        scheduler.start()
\ No newline at end of file
+    global _standby
+    _standby = False
+    if SCHEDULER_MODE == "poll":
+        scheduler.add_job(
+            _poll_due, "interval", seconds=POLL_INTERVAL_SECONDS, id="due_poller",
+            coalesce=True, max_instances=1, replace_existing=True,
+        )
+    else:
+        scheduler.add_job(
+            _catch_up, "interval", seconds=POLL_INTERVAL_SECONDS, id="catch_up",
+            coalesce=True, max_instances=1, replace_existing=True,
+        )
+    if SCHEDULER_MODE == "heap":
+        due_queue.start()
+    if scheduler.running:
+        # Paused by standby() since the last term
+        scheduler.resume()
+    else:
+        scheduler.start()
+
+
+def standby():
+    """
+    Stop firing in this process, e.g. when another worker is or becomes the leader:
+    jobs and due queue entries are dropped and schedule_task() only records next_run_at.
+    start() (after rehydrate()) takes over again.
+    """
+    global _standby
+    _standby = True
+    if SCHEDULER_MODE == "heap":
+        due_queue.stop()
+        due_queue.clear()
+    # Paused rather than shut down: APScheduler can't start again after shutdown()
+    if scheduler.running:
+        scheduler.pause()
+    scheduler.remove_all_jobs()
+    # Wait out a fire already in progress; jobs still queued on the executor see _standby and return
+    with _fire_lock:
+        pass
@@ -1,5 +1,5 @@
-from typing import Optional, List
-from datetime import datetime
+from typing import Optional
+from datetime import date, datetime
 from pydantic import BaseModel, field_validator
 from utils import to_aware
 
@@ -34,6 +34,7 @@ class TaskRead(BaseModel):
     auto_print: bool
     is_active: bool
     last_fired_at: Optional[datetime]
+    next_run_at: Optional[datetime] = None
     category: str
 
 class TaskUpdate(BaseModel):
@@ -96,5 +97,37 @@ class BlackoutPeriodUpdate(BaseModel):
             v = _dt.fromisoformat(v.replace("Z", "+00:00")) if "Z" in v else _dt.fromisoformat(v)
         return to_aware(v)
 
-class ImportPayload(BaseModel):
-    tasks: List[TaskCreate]
+class OccurrenceRead(BaseModel):
+    task_id: int
+    title: str
+    category: str
+    start: datetime
+
+class PrintJobRead(BaseModel):
+    id: int
+    task_id: Optional[int]
+    title: str
+    printer: str
+    status: str
+    attempts: int
+    last_error: Optional[str]
+    created_at: datetime
+    next_attempt_at: datetime
+    finished_at: Optional[datetime]
+
+class FireLogRead(BaseModel):
+    id: int
+    task_id: int
+    planned_at: Optional[datetime]
+    fired_at: datetime
+    outcome: str
+    duration_ms: Optional[float]
+    printer: Optional[str]
+    error: Optional[str]
+
+class FireLogSummaryRead(BaseModel):
+    day: date
+    outcome: str
+    count: int
+    avg_duration_ms: Optional[float]
+    max_duration_ms: Optional[float]
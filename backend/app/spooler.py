@@ -0,0 +1,246 @@
+# spooler.py
+import os
+import itertools
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from models import PrintJob
+from crud import (
+    create_print_job, create_print_jobs, update_print_job, count_pending_print_jobs, count_pending_print_jobs_by_printer,
+    claim_next_print_job, next_print_attempt_at, requeue_interrupted_print_jobs, list_unrouted_print_jobs,
+    delete_finished_print_jobs,
+)
+from printers import PrinterRegistry, registry
+import async_crud
+import metrics
+import events
+import firelog
+from utils import now_tz, to_aware
+
+SPOOL_MAX_QUEUE = int(os.getenv("SPOOL_MAX_QUEUE", "200"))
+SPOOL_MAX_ATTEMPTS = int(os.getenv("SPOOL_MAX_ATTEMPTS", "5"))
+SPOOL_BACKOFF_SECONDS = float(os.getenv("SPOOL_BACKOFF_SECONDS", "2"))
+SPOOL_MAX_BACKOFF_SECONDS = float(os.getenv("SPOOL_MAX_BACKOFF_SECONDS", "300"))
+SPOOL_RETENTION_DAYS = int(os.getenv("SPOOL_RETENTION_DAYS", "7"))
+
+# Longest a worker sleeps without looking at its queue; jobs queued by other uvicorn
+# workers (which can't wake this process) wait at most about this long
+SPOOL_POLL_SECONDS = float(os.getenv("SPOOL_POLL_SECONDS", "30"))
+
+
+class SpoolFullError(Exception):
+    pass
+
+
+class PrintSpooler:
+    """
+    Persistent print queue with one worker thread per printer; each worker owns
+    its printer's I/O, so different printers print in parallel while receipts on
+    one printer never interleave. Jobs live in the printjob table, so they survive
+    restarts. A job is routed to the least busy printer of its category; a failed
+    attempt moves it to the category's next printer, and once every printer has
+    had a go it is retried with exponential backoff until SPOOL_MAX_ATTEMPTS.
+    """
+
+    def __init__(self, printers: PrinterRegistry, max_queue: int = SPOOL_MAX_QUEUE,
+                 max_attempts: int = SPOOL_MAX_ATTEMPTS):
+        self.printers = printers
+        self.max_queue = max_queue
+        self.max_attempts = max_attempts
+        self._wakeups = {name: threading.Event() for name in printers.names()}
+        self._stopping = threading.Event()
+        self._threads: Dict[str, threading.Thread] = {}
+        # Rotates the starting point among equally busy printers
+        self._round_robin = itertools.count()
+        self._prune_lock = threading.Lock()
+        self._last_prune = None
+
+    def start(self):
+        if any(t.is_alive() for t in self._threads.values()):
+            return
+        requeued = requeue_interrupted_print_jobs()
+        if requeued:
+            print(f"Requeued {requeued} interrupted print job(s)")
+        self._reroute_orphans()
+        self._stopping.clear()
+        for name in self.printers.names():
+            thread = threading.Thread(target=self._run, args=(name,), name=f"print-spooler-{name}", daemon=True)
+            self._threads[name] = thread
+            thread.start()
+
+    def stop(self, timeout: float = 10.0):
+        self._stopping.set()
+        for wakeup in self._wakeups.values():
+            wakeup.set()
+        for thread in self._threads.values():
+            thread.join(timeout)
+
+    def submit(self, title: str, description: str = "", category: str = "other",
+               task_id: Optional[int] = None, planned_at: Optional[datetime] = None) -> PrintJob:
+        """
+        Queue a receipt and return its job immediately; raises SpoolFullError when full.
+        Receipts of scheduled fires pass their planned time and end up in the fire log.
+        """
+        job = self._route(count_pending_print_jobs_by_printer(), title, description, category, task_id)
+        job.planned_at = planned_at
+        job = create_print_job(job)
+        self._wakeups[job.printer].set()
+        return job
+
+    def submit_many(self, receipts: List[Tuple[str, str, str, Optional[int], Optional[datetime]]]) -> int:
+        """
+        Queue several (title, description, category, task_id, planned_at) receipts in one transaction,
+        routing each as submit() would. Receipts beyond the free queue space are dropped;
+        returns how many were queued.
+        """
+        pending = count_pending_print_jobs_by_printer()
+        room = max(self.max_queue - sum(pending.values()), 0)
+        jobs = []
+        for title, description, category, task_id, planned_at in receipts[:room]:
+            printer = self._pick(self.printers.candidates(category), pending)
+            pending[printer] = pending.get(printer, 0) + 1
+            jobs.append(PrintJob(
+                task_id=task_id, title=title, description=description, category=category, printer=printer,
+                planned_at=planned_at,
+            ))
+        if jobs:
+            printers = {job.printer for job in jobs}
+            create_print_jobs(jobs)
+            for printer in printers:
+                self._wakeups[printer].set()
+        if len(receipts) > len(jobs):
+            metrics.receipts_dropped.inc(len(receipts) - len(jobs))
+        return len(jobs)
+
+    async def submit_async(self, title: str, description: str = "", category: str = "other",
+                           task_id: Optional[int] = None) -> PrintJob:
+        """submit() for the event loop: queues through async DB sessions, never blocking a thread."""
+        job = self._route(await async_crud.count_pending_print_jobs_by_printer(), title, description, category, task_id)
+        job = await async_crud.create_print_job(job)
+        self._wakeups[job.printer].set()
+        return job
+
+    def _route(self, pending: Dict[str, int], title: str, description: str, category: str,
+               task_id: Optional[int]) -> PrintJob:
+        if sum(pending.values()) >= self.max_queue:
+            metrics.receipts_dropped.inc()
+            raise SpoolFullError(f"Print queue is full ({self.max_queue} pending jobs)")
+        printer = self._pick(self.printers.candidates(category), pending)
+        return PrintJob(task_id=task_id, title=title, description=description, category=category, printer=printer)
+
+    def queue_depth(self) -> int:
+        return count_pending_print_jobs()
+
+    def queue_depths(self) -> Dict[str, int]:
+        pending = count_pending_print_jobs_by_printer()
+        return {name: pending.get(name, 0) for name in self.printers.names()}
+
+    def _pick(self, candidates: List[str], pending: Dict[str, int]) -> str:
+        """Printer with the fewest pending jobs, rotating between ties."""
+        offset = next(self._round_robin) % len(candidates)
+        rotated = candidates[offset:] + candidates[:offset]
+        return min(rotated, key=lambda name: pending.get(name, 0))
+
+    def _reroute_orphans(self):
+        # Jobs queued for a printer that was removed from the configuration
+        orphans = list_unrouted_print_jobs(self.printers.names())
+        if not orphans:
+            return
+        pending = count_pending_print_jobs_by_printer()
+        for job in orphans:
+            printer = self._pick(self.printers.candidates(job.category), pending)
+            pending[printer] = pending.get(printer, 0) + 1
+            update_print_job(job.id, printer=printer)
+        print(f"Rerouted {len(orphans)} print job(s) from unknown printers")
+
+    def _backoff(self, attempts: int) -> timedelta:
+        return timedelta(seconds=min(SPOOL_BACKOFF_SECONDS * 2 ** (attempts - 1), SPOOL_MAX_BACKOFF_SECONDS))
+
+    def _run(self, name: str):
+        while not self._stopping.is_set():
+            try:
+                job = claim_next_print_job(now_tz(), name)
+                if job:
+                    self._print(name, job)
+                    continue
+                self._prune()
+                self._wait_for_work(name)
+            except Exception as e:
+                # Keep the worker alive through DB hiccups
+                print(f"Print spooler error ({name}): {e}")
+                self._stopping.wait(1.0)
+
+    def _wait_for_work(self, name: str):
+        printer = self.printers.get(name)
+        # Hold the printer connection only while receipts keep coming
+        printer.close_if_idle()
+        timeout = min(SPOOL_POLL_SECONDS, printer.keepalive_seconds)
+        next_at = next_print_attempt_at(name)
+        if next_at is not None:
+            timeout = min(timeout, max((to_aware(next_at) - now_tz()).total_seconds(), 0.0))
+        wakeup = self._wakeups[name]
+        wakeup.wait(timeout)
+        wakeup.clear()
+
+    def _print(self, name: str, job: PrintJob):
+        try:
+            self.printers.get(name).print_task(job.title, job.description, job.category)
+        except Exception as e:
+            final = job.attempts >= self.max_attempts
+            metrics.print_failures.inc(printer=name, final=str(final).lower())
+            if final:
+                print(f"Print job {job.id} failed after {job.attempts} attempts: {e}")
+                update_print_job(job.id, status="failed", last_error=str(e), finished_at=now_tz())
+                self._log_fire("failed", name, job, error=str(e))
+                self._publish("print.failed", name, job, error=str(e))
+                return
+            candidates = self.printers.candidates(job.category)
+            if len(candidates) > 1 and job.attempts % len(candidates):
+                # Fail over to the category's next printer straight away
+                position = candidates.index(name) if name in candidates else -1
+                fallback = candidates[(position + 1) % len(candidates)]
+                update_print_job(job.id, status="queued", last_error=str(e), printer=fallback, next_attempt_at=now_tz())
+                self._wakeups[fallback].set()
+            else:
+                update_print_job(
+                    job.id, status="queued", last_error=str(e),
+                    next_attempt_at=now_tz() + self._backoff(job.attempts // len(candidates) or 1),
+                )
+            self._publish("print.retry", name, job, error=str(e))
+            return
+        metrics.prints_done.inc(printer=name)
+        update_print_job(job.id, status="done", last_error=None, finished_at=now_tz())
+        self._log_fire("printed", name, job)
+        self._publish("print.done", name, job)
+
+    @staticmethod
+    def _log_fire(outcome: str, printer: str, job: PrintJob, error: Optional[str] = None):
+        # Only receipts of scheduled fires; the duration runs from the fire to the final attempt
+        if job.planned_at is None or job.task_id is None:
+            return
+        fired_at = to_aware(job.created_at)
+        duration_ms = round((now_tz() - fired_at).total_seconds() * 1000, 1)
+        firelog.record(
+            job.task_id, fired_at, outcome, planned_at=job.planned_at, duration_ms=duration_ms,
+            printer=printer, error=error,
+        )
+
+    @staticmethod
+    def _publish(event: str, printer: str, job: PrintJob, **extra):
+        events.publish(event, {"job_id": job.id, "task_id": job.task_id, "printer": printer, "attempts": job.attempts, **extra})
+
+    def _prune(self):
+        # Every worker gets here when idle; one sweep per hour is plenty
+        with self._prune_lock:
+            now = now_tz()
+            if self._last_prune and now - self._last_prune < timedelta(hours=1):
+                return
+            self._last_prune = now
+        delete_finished_print_jobs(now - timedelta(days=SPOOL_RETENTION_DAYS))
+
+
+spooler = PrintSpooler(registry)
+
+metrics.Gauge(
+    "receipttasker_print_queue_depth", "Queued or printing jobs per printer", spooler.queue_depths, ["printer"],
+)
@@ -0,0 +1,97 @@
+"""
+Benchmark: SQLite write contention under API load plus scheduler fires,
+default storage profile vs. DB_PROFILE=production.
+
+    cd backend/benchmarks && python bench_contention.py [seconds] [tasks]
+
+Each profile runs in its own process against a fresh database. For the given time:
+  - 4 "API" threads alternate a paged task listing, a task edit and a task create
+  - 1 "scheduler" thread keeps writing last_fired_at/next_run_at, as fires do
+and the script reports operations, latency percentiles and lock errors per kind.
+"""
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+APP_DIR = os.path.join(os.path.dirname(__file__), "..", "app")
+API_THREADS = 4
+
+
+def worker_main(seconds: float, count: int):
+    sys.path.insert(0, APP_DIR)
+    import database
+    from database import init_db
+    from models import Task
+    from crud import bulk_create_tasks, create_task, page_tasks, update_task
+    from utils import now_tz
+
+    init_db()
+    start = datetime(2026, 1, 1, 8, 0)
+    for offset in range(0, count, 5000):
+        bulk_create_tasks([
+            Task(title=f"task {i}", description="x" * 200, start_at=start + timedelta(minutes=i), rrule="FREQ=DAILY")
+            for i in range(offset, min(offset + 5000, count))
+        ])
+
+    timings = {"list": [], "edit": [], "create": [], "fire": []}
+    errors = {kind: 0 for kind in timings}
+    deadline = time.perf_counter() + seconds
+
+    def timed(kind, fn):
+        started = time.perf_counter()
+        try:
+            fn()
+        except Exception as e:
+            if "locked" not in str(e):
+                raise
+            errors[kind] += 1
+            return
+        timings[kind].append(time.perf_counter() - started)
+
+    def api(seed):
+        rng = random.Random(seed)
+        while time.perf_counter() < deadline:
+            timed("list", lambda: page_tasks(limit=50, after=[rng.randint(1, count)], fields=["id", "title"]))
+            timed("edit", lambda: update_task(rng.randint(1, count), title=f"edited {rng.random()}"))
+            timed("create", lambda: create_task(Task(title="new", start_at=start, rrule="FREQ=DAILY")))
+
+    def scheduler():
+        rng = random.Random(0)
+        while time.perf_counter() < deadline:
+            now = now_tz()
+            timed("fire", lambda: update_task(rng.randint(1, count), last_fired_at=now, next_run_at=now + timedelta(days=1)))
+
+    threads = [threading.Thread(target=api, args=(i,)) for i in range(API_THREADS)]
+    threads.append(threading.Thread(target=scheduler))
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    print(f"profile={database.DB_PROFILE} journal={database.engine.connect().exec_driver_sql('PRAGMA journal_mode').scalar()}")
+    for kind, samples in timings.items():
+        samples.sort()
+        p95 = samples[int(len(samples) * 0.95)] if samples else 0
+        p50 = statistics.median(samples) if samples else 0
+        print(
+            f"  {kind:<7} {len(samples) / seconds:8.1f} ops/s  p50 {p50 * 1000:7.2f} ms  "
+            f"p95 {p95 * 1000:7.2f} ms  locked {errors[kind]}"
+        )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--worker":
+        worker_main(float(sys.argv[2]), int(sys.argv[3]))
+        sys.exit(0)
+    seconds = sys.argv[1] if len(sys.argv) > 1 else "10"
+    count = sys.argv[2] if len(sys.argv) > 2 else "10000"
+    for profile in ("default", "production"):
+        env = dict(os.environ, DB_PROFILE=profile,
+                   DB_PATH=os.path.join(tempfile.mkdtemp(prefix="bench-contention-"), "bench.db"))
+        subprocess.run([sys.executable, __file__, "--worker", seconds, count], env=env, check=True)
@@ -0,0 +1,52 @@
+"""
+Benchmark: firing N simultaneously due tasks one by one vs. as one batch.
+
+    cd backend/benchmarks && python bench_fire_batch.py [n ...]
+
+"per-task" is what every APScheduler job does: get_task, blackout check, spooler
+submit and an update_task commit. "batched" is the heap/poll path: one read, one
+blackout check, one bulk spooler hand-off and one bulk update. The spooler worker
+isn't started, so "printing" ends at the queued print job rows.
+"""
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+os.environ["DB_PATH"] = os.path.join(tempfile.mkdtemp(prefix="bench-fire-"), "bench.db")
+os.environ["SPOOL_MAX_QUEUE"] = "10000000"
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+
+from database import init_db  # noqa: E402
+from models import Task  # noqa: E402
+from crud import bulk_create_tasks, get_task, get_tasks  # noqa: E402
+from scheduling import _fire, _fire_batch  # noqa: E402
+from utils import now_tz  # noqa: E402
+
+
+def make_tasks(n: int):
+    start = datetime(2026, 1, 1, 8, 0)
+    return bulk_create_tasks([Task(title=f"task {i}", start_at=start, rrule="FREQ=DAILY") for i in range(n)])
+
+
+def per_task(ids):
+    now = now_tz()
+    for task_id in ids:
+        _fire(get_task(task_id), now)
+
+
+def batched(ids):
+    _fire_batch(get_tasks(ids), now_tz())
+
+
+if __name__ == "__main__":
+    sizes = [int(n) for n in sys.argv[1:]] or [10, 100, 1000]
+    init_db()
+    for n in sizes:
+        for name, fn in (("per-task", per_task), ("batched", batched)):
+            ids = make_tasks(n)
+            started = time.perf_counter()
+            fn(ids)
+            elapsed = time.perf_counter() - started
+            print(f"{n:6d} tasks  {name:<9} {elapsed * 1000:9.1f} ms total  {elapsed * 1e6 / n:8.1f} us/task")
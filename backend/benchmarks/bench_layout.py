@@ -0,0 +1,104 @@
+"""
+Micro-benchmark: receipt text layout on long descriptions.
+
+    cd backend/benchmarks && python bench_layout.py [repeat]
+
+"legacy" is the word-by-word wrap printing.py used before layout.py, kept here
+verbatim for comparison; "cold" is layout.wrap with empty caches, "warm" a repeat
+of the same text. Encoding compares python-escpos' per-call magic encoder with
+layout.encode's one-pass translation.
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+
+import layout  # noqa: E402
+from escpos.printer import Dummy  # noqa: E402
+
+WIDTH = 24
+WORDS = (
+    "de het een en van in op met voor ook niet maar nog even altijd borden kast la bestek "
+    "spiegel wastafel douchedeur afvoer planten vensterbank cactus vuilnis container "
+    "schoonmaakmiddelen vaatwasserontkalkingsmiddel verantwoordelijkheidsgevoel "
+    "badkamertegels keukenkastjes stofzuigerzakken ontstoppen café één reünie "
+    "“aanrecht” €5 – …"
+).split()
+
+
+def description(chars: int, seed: int = 7) -> str:
+    rng = random.Random(seed)
+    words, size = [], 0
+    while size < chars:
+        word = rng.choice(WORDS)
+        words.append(word)
+        size += len(word) + 1
+    return " ".join(words)
+
+
+def legacy_wrap(text: str, width: int) -> list:
+    words = text.split()
+    lines = []
+    current_line = ""
+    for word in words:
+        test_line = current_line + word if not current_line else current_line + " " + word
+        if len(test_line) <= width:
+            current_line = test_line
+        else:
+            if current_line:
+                lines.append(current_line)
+            if len(word) > width:
+                while len(word) > width:
+                    break_point = width
+                    for i in range(min(width, len(word))):
+                        if word[i] in 'aeiou' and i > 2 and i < len(word) - 2:
+                            break_point = i + 1
+                            break
+                    lines.append(word[:break_point])
+                    word = word[break_point:]
+                current_line = word
+            else:
+                current_line = word
+    if current_line:
+        lines.append(current_line)
+    return lines if lines else [""]
+
+
+def legacy_encode(lines) -> bytes:
+    p = Dummy()
+    for line in lines:
+        p.text(line + "\n")
+    return p.output
+
+
+def timed(fn, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) * 1e3 / repeat
+
+
+def cold_wrap(text: str):
+    layout.wrap.cache_clear()
+    layout._hyphenation_points.cache_clear()
+    layout._substitute.cache_clear()
+    return layout.wrap(text, WIDTH)
+
+
+if __name__ == "__main__":
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    print(f"{'chars':>7} {'legacy ms':>10} {'cold ms':>9} {'warm us':>9} {'escpos enc ms':>14} {'encode ms':>10}")
+    for chars in (500, 5_000, 50_000):
+        text = description(chars)
+        lines = layout.wrap(text, WIDTH)
+        assert all(len(line) <= WIDTH for line in lines)
+        legacy = timed(lambda: legacy_wrap(text, WIDTH), repeat)
+        cold = timed(lambda: cold_wrap(text), repeat)
+        layout.wrap(text, WIDTH)
+        warm = timed(lambda: layout.wrap(text, WIDTH), repeat * 100) * 1e3
+        magic = timed(lambda: legacy_encode(lines), max(repeat // 4, 1))
+        encode = timed(lambda: layout.encode("\n".join(lines)), repeat)
+        print(f"{chars:>7} {legacy:>10.2f} {cold:>9.2f} {warm:>9.2f} {magic:>14.2f} {encode:>10.3f}")
+    print(f"layout cache: {layout.wrap.cache_info()}")
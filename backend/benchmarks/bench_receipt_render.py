@@ -0,0 +1,80 @@
+"""
+Micro-benchmark: per-call ESC/POS writes vs. one pre-rendered buffer per receipt.
+
+    cd backend/benchmarks && python bench_receipt_render.py [iterations]
+
+The "per-call" path drives python-escpos set()/text() straight at the socket, as
+print_task did before receipts were rendered; the "rendered" path is what
+ThermalPrinter sends now (cached body + patched timestamp, one sendall).
+Neither touches the network: a counting fake socket stands in for the printer.
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+
+from escpos.printer import Network  # noqa: E402
+from printing import ThermalPrinter, _write_header, _write_body, _render_parts  # noqa: E402
+
+TS = "18-10-2026 07:00"
+RECEIPTS = [
+    ("Vaatwasser uitruimen", "Borden in de bovenste kast, bestek in de la", "kitchen"),
+    ("Planten water geven", "Ook de cactus op de vensterbank, maar niet te veel", "living_room"),
+    ("Vuilnis buiten zetten", "", "other"),
+    ("Badkamer schoonmaken", "Spiegel, wastafel, douchedeur en de afvoer ontstoppen", "bathroom"),
+]
+
+
+class CountingSocket:
+    def __init__(self):
+        self.writes = 0
+        self.bytes = 0
+
+    def sendall(self, data: bytes):
+        self.writes += 1
+        self.bytes += len(data)
+
+    def shutdown(self, how):
+        pass
+
+    def close(self):
+        pass
+
+
+def per_call(iterations: int) -> CountingSocket:
+    sock = CountingSocket()
+    p = Network("bench", port=0)
+    p.device = sock
+    for i in range(iterations):
+        title, description, category = RECEIPTS[i % len(RECEIPTS)]
+        _write_header(p, title, category)
+        p.text(TS)
+        _write_body(p, description)
+    return sock
+
+
+def rendered(iterations: int) -> CountingSocket:
+    sock = CountingSocket()
+    printer = ThermalPrinter("bench", 0)
+    for i in range(iterations):
+        sock.sendall(printer.render(*RECEIPTS[i % len(RECEIPTS)], ts=TS))
+    return sock
+
+
+def run(name: str, fn, iterations: int):
+    started = time.perf_counter()
+    sock = fn(iterations)
+    elapsed = time.perf_counter() - started
+    print(
+        f"{name:<10} {elapsed * 1e6 / iterations:8.1f} us/receipt  "
+        f"{sock.writes / iterations:5.1f} writes/receipt  {sock.bytes // iterations} bytes/receipt"
+    )
+
+
+if __name__ == "__main__":
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    _render_parts.cache_clear()
+    run("per-call", per_call, iterations)
+    run("rendered", rendered, iterations)
+    print(f"render cache: {_render_parts.cache_info()}")
@@ -0,0 +1,81 @@
+"""
+Benchmark: task search through the FTS5 indexes vs. the LIKE '%term%' fallback.
+
+    cd backend/benchmarks && python bench_search.py [tasks] [repeats]
+
+Builds a throwaway SQLite database with synthetic tasks (100k by default), then
+times crud.list_tasks(search=...) for a few queries: "words" with only the word
+index, "fts" with substring matches from the trigram index as well, "like" with
+neither.
+"""
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+os.environ["DB_PATH"] = os.path.join(tempfile.mkdtemp(prefix="bench-search-"), "bench.db")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+
+import database  # noqa: E402
+from database import init_db  # noqa: E402
+from models import Task  # noqa: E402
+from crud import bulk_create_tasks, list_tasks  # noqa: E402
+
+WORDS = (
+    "vaatwasser uitruimen planten water geven vuilnis buiten zetten badkamer schoonmaken "
+    "spiegel wastafel douche afvoer ramen lappen stofzuigen boodschappen fiets band "
+    "oppompen kattenbak verschonen filter vervangen koelkast ontdooien bed verschonen"
+).split()
+SYLLABLES = ["ka", "ver", "ton", "el", "mi", "ra", "sto", "len", "bo", "dee", "pu", "gra", "ste", "wo", "ni", "zan"]
+CATEGORIES = ["kitchen", "bathroom", "living_room", "garden", "shed", "other"]
+QUERIES = ["vaat", "planten water", "filter vervangen koelkast", "nonexistent"]
+
+
+def populate(count: int, batch: int = 5000):
+    rng = random.Random(42)
+    # A realistic-ish vocabulary: a few thousand filler words around the real ones
+    filler = sorted({"".join(rng.choices(SYLLABLES, k=rng.randint(2, 4))) for _ in range(5000)})
+    vocabulary = filler + WORDS
+    start = datetime(2026, 1, 1, 8, 0)
+    for offset in range(0, count, batch):
+        bulk_create_tasks([
+            Task(
+                title=" ".join(rng.choices(vocabulary, k=3)),
+                description=" ".join(rng.choices(vocabulary, k=12)),
+                start_at=start + timedelta(minutes=i),
+                rrule="FREQ=DAILY",
+                category=rng.choice(CATEGORIES),
+            )
+            for i in range(offset, min(offset + batch, count))
+        ])
+
+
+def run(label: str, query: str, repeats: int):
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        results = list_tasks(search=query)
+        timings.append(time.perf_counter() - started)
+    print(f"{label:<5} {query!r:<30} {statistics.median(timings) * 1000:9.1f} ms  {len(results):6d} results")
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    init_db()
+    started = time.perf_counter()
+    populate(count)
+    print(f"Inserted {count} tasks in {time.perf_counter() - started:.1f}s (FTS available: {database.FTS_ENABLED})")
+    fts, trigram = database.FTS_ENABLED, database.FTS_TRIGRAM
+    for query in QUERIES:
+        if fts:
+            database.FTS_ENABLED, database.FTS_TRIGRAM = True, False
+            run("words", query, repeats)
+        if trigram:
+            database.FTS_TRIGRAM = True
+            run("fts", query, repeats)
+        database.FTS_ENABLED = database.FTS_TRIGRAM = False
+        run("like", query, repeats)
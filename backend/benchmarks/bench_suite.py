@@ -0,0 +1,209 @@
+"""
+Benchmark suite: scheduling, rehydration, search, import/export and receipt
+rendering against synthetic corpora of 1k, 10k and 100k tasks (see corpus.py).
+
+    cd backend/benchmarks && python bench_suite.py [--sizes 1000,10000,100000] [--out FILE] [--compare OLD.json]
+
+Each corpus size runs in its own process against a fresh SQLite database. Results
+are written as JSON (default: results/<git revision>.json) together with the
+revision, Python and SQLite versions. --compare prints every benchmark against an
+earlier results file and exits with status 1 when one got slower than --threshold.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import timedelta
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+APP_DIR = os.path.join(HERE, "..", "app")
+RESULTS_DIR = os.path.join(HERE, "results")
+DEFAULT_SIZES = (1000, 10_000, 100_000)
+# Per-item benchmarks only walk this many tasks, so large corpora stay quick
+SAMPLE_SIZE = 5000
+SEARCHES = ["vaat", "planten water", "filter vervangen koelkast", "nonexistent"]
+TS = "18-10-2026 07:00"
+
+
+def _timed(fn, items: int = 1, repeats: int = 1) -> dict:
+    """Median wall time of `repeats` calls; per_item_us divides it by `items`."""
+    runs = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - started)
+    seconds = statistics.median(runs)
+    return {"seconds": round(seconds, 6), "items": items, "per_item_us": round(seconds * 1e6 / max(items, 1), 3)}
+
+
+def worker_main(size: int, out_path: str):
+    sys.path.insert(0, APP_DIR)
+    import corpus
+    import rrules
+    import scheduling
+    from crud import create_blackout_period, iter_tasks, list_tasks
+    from database import init_db, migrate_db
+    from duequeue import DueQueue
+    from exporter import gzipped, iter_export
+    from importer import BulkImporter, batched
+    from models import BlackoutPeriod
+    from printing import ThermalPrinter, _render_parts, RECEIPT_CACHE_SIZE
+    from schemas import BlackoutPeriodCreate
+    import blackouts
+    from utils import now_tz
+
+    init_db()
+    migrate_db()
+    results = {}
+
+    # Import: validate, insert and schedule (jobs mode, scheduler not started)
+    rows = corpus.task_rows(size)
+
+    def run_import():
+        importer = BulkImporter()
+        for batch in batched(enumerate(rows, 1)):
+            importer.add_batch(batch)
+        summary = importer.finish()
+        assert not summary["failed"], summary["errors"][:5]
+
+    results["import"] = _timed(run_import, size)
+    scheduling.scheduler.remove_all_jobs()
+
+    for row in corpus.blackout_rows(max(10, size // 1000)):
+        create_blackout_period(BlackoutPeriod(**BlackoutPeriodCreate.model_validate(row).model_dump()))
+    blackouts.invalidate()
+    rng = random.Random(1)
+    probes = [now_tz() + timedelta(minutes=rng.randint(-525_600, 525_600)) for _ in range(SAMPLE_SIZE)]
+    results["blackout_check"] = _timed(lambda: [blackouts.is_blacked_out(dt) for dt in probes], len(probes), 3)
+
+    tasks = [t for batch in iter_tasks(5000) for t in batch]
+    sample = random.Random(2).sample(tasks, min(SAMPLE_SIZE, len(tasks)))
+    active = [t for t in sample if t.is_active]
+
+    # Cold: every rule compiled from scratch; warm: served from the rule cache, so only as
+    # many tasks as the cache holds (cycling more through the LRU would miss every time)
+    rrules._cache = rrules.RRuleCache()
+    results["next_occurrence_cold"] = _timed(lambda: [scheduling._next_occurrence(t) for t in sample], len(sample))
+    cached = sample[:rrules.RRULE_CACHE_SIZE]
+    [scheduling._next_occurrence(t) for t in cached]
+    misses = rrules._cache.misses
+    results["next_occurrence_warm"] = _timed(lambda: [scheduling._next_occurrence(t) for t in cached], len(cached), 3)
+    assert rrules._cache.misses == misses, "warm pass missed the rule cache"
+
+    scheduling.SCHEDULER_MODE = "jobs"
+    results["schedule_task"] = _timed(lambda: [scheduling.schedule_task(t) for t in active], len(active))
+    scheduling.scheduler.remove_all_jobs()
+
+    for mode in ("jobs", "poll", "heap"):
+        scheduling.SCHEDULER_MODE = mode
+        scheduling.due_queue = DueQueue(scheduling._fire_due, scheduling.SCHEDULER_TICK_SECONDS)
+        rrules._cache = rrules.RRuleCache()
+        results[f"rehydrate_{mode}"] = _timed(scheduling.rehydrate, size)
+        scheduling.scheduler.remove_all_jobs()
+
+    for query in SEARCHES:
+        results[f"search[{query}]"] = _timed(lambda: list_tasks(search=query), 1, 3)
+
+    for name, make in (
+        ("export_json", lambda: iter_export("json")),
+        ("export_ndjson", lambda: iter_export("ndjson")),
+        ("export_ndjson_gzip", lambda: gzipped(iter_export("ndjson"))),
+    ):
+        results[name] = _timed(lambda: sum(len(chunk) for chunk in make()), size)
+
+    printer = ThermalPrinter("bench", 0)
+    receipts = [(t.title, t.description or "", t.category) for t in sample]
+    _render_parts.cache_clear()
+    results["render_cold"] = _timed(lambda: [printer.render(*r, ts=TS) for r in receipts], len(receipts))
+    cached = receipts[:RECEIPT_CACHE_SIZE]
+    [printer.render(*r, ts=TS) for r in cached]
+    results["render_warm"] = _timed(lambda: [printer.render(*r, ts=TS) for r in cached], len(cached), 3)
+
+    with open(out_path, "w") as f:
+        json.dump(results, f)
+
+
+def _revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "describe", "--always", "--dirty"], cwd=HERE, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> int:
+    """Print current vs. baseline per benchmark; returns the number of regressions."""
+    regressions = 0
+    for size, benches in current["results"].items():
+        old_benches = baseline.get("results", {}).get(size, {})
+        for name, result in benches.items():
+            old = old_benches.get(name)
+            if not old or not old["seconds"]:
+                continue
+            ratio = result["seconds"] / old["seconds"]
+            flag = "  REGRESSION" if ratio > threshold else ""
+            regressions += bool(flag)
+            print(f"{size:>7} {name:<34} {old['seconds'] * 1000:10.1f} ms -> {result['seconds'] * 1000:10.1f} ms  x{ratio:5.2f}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)), help="comma-separated corpus sizes")
+    parser.add_argument("--out", help="results file (default: results/<git revision>.json)")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    parser.add_argument("--threshold", type=float, default=1.25, help="slowdown ratio reported as a regression")
+    args = parser.parse_args()
+
+    revision = _revision()
+    report = {
+        "revision": revision,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "results": {},
+    }
+    for size in (int(s) for s in args.sizes.split(",")):
+        workdir = tempfile.mkdtemp(prefix="bench-suite-")
+        out_path = os.path.join(workdir, "results.json")
+        env = dict(os.environ, DB_PATH=os.path.join(workdir, "bench.db"), SCHEDULER_MODE="jobs")
+        started = time.perf_counter()
+        subprocess.run(
+            [sys.executable, __file__, "--worker", str(size), out_path],
+            env=env, check=True, stdout=subprocess.DEVNULL,
+        )
+        with open(out_path) as f:
+            report["results"][str(size)] = json.load(f)
+        print(f"{size:>7} tasks done in {time.perf_counter() - started:.1f}s")
+
+    out = args.out or os.path.join(RESULTS_DIR, f"{revision}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {out}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if compare(report, baseline, args.threshold):
+            sys.exit(1)
+    else:
+        for size, benches in report["results"].items():
+            for name, result in benches.items():
+                print(f"{size:>7} {name:<34} {result['seconds'] * 1000:10.1f} ms  {result['per_item_us']:10.1f} us/item")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--worker":
+        worker_main(int(sys.argv[2]), sys.argv[3])
+    else:
+        main()
@@ -0,0 +1,80 @@
+"""
+Deterministic synthetic corpora for the benchmarks: tasks as import rows (the JSON
+shape POST /api/import takes) and blackout periods, generated from a fixed seed so
+every run and every version sees exactly the same data.
+"""
+import random
+from datetime import datetime, timedelta
+from typing import List
+
+WORDS = (
+    "vaatwasser uitruimen planten water geven vuilnis buiten zetten badkamer schoonmaken "
+    "spiegel wastafel douche afvoer ramen lappen stofzuigen boodschappen fiets band "
+    "oppompen kattenbak verschonen filter vervangen koelkast ontdooien bed verschonen"
+).split()
+SYLLABLES = ["ka", "ver", "ton", "el", "mi", "ra", "sto", "len", "bo", "dee", "pu", "gra", "ste", "wo", "ni", "zan"]
+CATEGORIES = ["kitchen", "bathroom", "bedroom", "living_room", "office", "shed", "garden", "other"]
+
+# (weight, rrule, has until) - roughly what a household schedule looks like
+RRULE_MIX = [
+    (30, "FREQ=DAILY", False),
+    (15, "FREQ=WEEKLY;BYDAY=MO,WE,FR", False),
+    (10, "FREQ=WEEKLY;INTERVAL=2;BYDAY=SA", False),
+    (10, "FREQ=MONTHLY;BYMONTHDAY=1", False),
+    (5, "FREQ=MONTHLY;BYDAY=1MO", False),
+    (5, "FREQ=HOURLY;INTERVAL=4", False),
+    (5, "FREQ=YEARLY", False),
+    (5, "FREQ=DAILY;COUNT=30", False),
+    (5, "FREQ=DAILY", True),
+    (10, "", False),  # one-off
+]
+
+# Fixed reference point, so corpora don't drift with the wall clock
+EPOCH = datetime(2026, 1, 1)
+
+
+def _vocabulary(rng: random.Random) -> List[str]:
+    filler = sorted({"".join(rng.choices(SYLLABLES, k=rng.randint(2, 4))) for _ in range(5000)})
+    return filler + WORDS
+
+
+def task_rows(count: int, seed: int = 42) -> List[dict]:
+    rng = random.Random(seed)
+    vocabulary = _vocabulary(rng)
+    weights = [w for w, _, _ in RRULE_MIX]
+    rows = []
+    for i in range(count):
+        _, rrule, has_until = rng.choices(RRULE_MIX, weights)[0]
+        start_at = EPOCH + timedelta(days=rng.randint(-365, 30), hours=rng.randint(7, 21), minutes=5 * rng.randint(0, 11))
+        words = rng.choices(vocabulary, k=rng.choice((0, 6, 12, 40)))
+        if words and rng.random() < 0.1:
+            # The odd unbreakable word, to exercise receipt wrapping
+            words.append("".join(rng.choices(SYLLABLES, k=15)))
+        row = {
+            "title": " ".join(rng.choices(vocabulary, k=rng.randint(2, 5))),
+            "description": " ".join(words),
+            "start_at": start_at.isoformat(),
+            "rrule": rrule,
+            "category": rng.choice(CATEGORIES),
+            "auto_print": rng.random() < 0.9,
+            "is_active": rng.random() < 0.95,
+        }
+        if has_until:
+            row["until"] = (start_at + timedelta(days=rng.randint(30, 730))).isoformat()
+        rows.append(row)
+    return rows
+
+
+def blackout_rows(count: int, seed: int = 42) -> List[dict]:
+    """Holidays and away weekends spread over two years, a few of them disabled."""
+    rng = random.Random(seed + 1)
+    rows = []
+    for i in range(count):
+        start = EPOCH + timedelta(days=rng.randint(-365, 365), hours=rng.choice((0, 18)))
+        rows.append({
+            "name": f"away {i}",
+            "start_date": start.isoformat(),
+            "end_date": (start + timedelta(days=rng.choice((1, 2, 3, 7, 14)))).isoformat(),
+            "is_active": rng.random() < 0.9,
+        })
+    return rows
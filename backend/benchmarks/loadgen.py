@@ -0,0 +1,157 @@
+"""
+Load generator: creates bursts of one-off tasks through the API, all due at the
+same moment per burst, then matches them against the receipts printer_sim.py logged
+to report fire-to-paper latency and print throughput per burst.
+
+    # terminal 1: the simulator, and the app pointed at it
+    python printer_sim.py --log /tmp/receipts.jsonl --latency-ms 200
+    PRINTER_IP=127.0.0.1 uvicorn main:app            # from backend/app
+    # terminal 2
+    python loadgen.py --log /tmp/receipts.jsonl --bursts 25,50,100,200 --interval 20
+
+Latency is measured from a task's planned start to the simulator's cut of its
+receipt, so it covers scheduler lag, queueing in the spooler and printer I/O.
+Bursts of growing size show where throughput stops keeping up (the saturation
+point). Only the standard library is used, so it runs from any Python 3 install.
+"""
+import argparse
+import json
+import os
+import secrets
+import statistics
+import sys
+import time
+import urllib.parse
+import urllib.request
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+
+def _request(method: str, url: str, body: Optional[bytes] = None, content_type: str = "application/json"):
+    req = urllib.request.Request(url, data=body, method=method, headers={"Content-Type": content_type})
+    with urllib.request.urlopen(req, timeout=120) as resp:
+        return json.loads(resp.read() or b"null"), resp.headers
+
+
+def create_bursts(api: str, run: str, sizes: List[int], lead: float, interval: float) -> Dict[str, Tuple[int, float]]:
+    """Import every burst's tasks in one request; returns title -> (burst, planned epoch seconds)."""
+    first = datetime.now().astimezone().replace(microsecond=0) + timedelta(seconds=lead)
+    planned, rows = {}, []
+    for burst, size in enumerate(sizes):
+        due = first + timedelta(seconds=burst * interval)
+        for i in range(size):
+            title = f"LG {run} {burst}-{i}"
+            planned[title] = (burst, due.timestamp())
+            rows.append(json.dumps({"title": title, "start_at": due.isoformat(), "rrule": "", "category": "other"}))
+    result, _ = _request("POST", f"{api}/import", "\n".join(rows).encode(), "application/x-ndjson")
+    if result["failed"]:
+        sys.exit(f"Import failed for {result['failed']} task(s): {result['errors'][:3]}")
+    print(f"Created {result['created']} tasks in {len(sizes)} burst(s), first due {first:%H:%M:%S}")
+    return planned
+
+
+def read_receipts(path: str, run: str, offset: int) -> Tuple[Dict[str, float], int]:
+    """Cut times of this run's receipts logged since `offset`; returns them and the new offset."""
+    cuts = {}
+    prefix = f"LG {run} "
+    with open(path) as f:
+        f.seek(offset)
+        while True:
+            line = f.readline()
+            if not line.endswith("\n"):
+                break
+            offset = f.tell()
+            receipt = json.loads(line)
+            for text in receipt["lines"]:
+                if text.startswith(prefix):
+                    cuts[text.strip()] = receipt["cut_at"]
+                    break
+    return cuts, offset
+
+
+def _percentile(samples: List[float], q: float) -> float:
+    return samples[min(int(len(samples) * q), len(samples) - 1)]
+
+
+def summarize(sizes: List[int], planned: Dict[str, Tuple[int, float]], cuts: Dict[str, float]) -> List[dict]:
+    bursts = []
+    for burst, size in enumerate(sizes):
+        titles = [t for t, (b, _) in planned.items() if b == burst]
+        due = planned[titles[0]][1]
+        printed = sorted(cuts[t] for t in titles if t in cuts)
+        latencies = sorted(cut - due for cut in printed)
+        span = printed[-1] - printed[0] if len(printed) > 1 else 0.0
+        bursts.append({
+            "burst": burst,
+            "size": size,
+            "printed": len(printed),
+            "missing": size - len(printed),
+            "latency_p50": round(statistics.median(latencies), 3) if latencies else None,
+            "latency_p95": round(_percentile(latencies, 0.95), 3) if latencies else None,
+            "latency_max": round(latencies[-1], 3) if latencies else None,
+            "receipts_per_second": round((len(printed) - 1) / span, 2) if span else None,
+        })
+    return bursts
+
+
+def cleanup(api: str, run: str):
+    """Delete this run's tasks again."""
+    deleted, cursor = 0, None
+    while True:
+        params = {"search": f"LG {run}", "limit": 500, "fields": "title"}
+        if cursor:
+            params["cursor"] = cursor
+        page, headers = _request("GET", f"{api}/tasks?{urllib.parse.urlencode(params)}")
+        for task in page:
+            if task["title"].startswith(f"LG {run} "):
+                _request("DELETE", f"{api}/tasks/{task['id']}")
+                deleted += 1
+        cursor = headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    print(f"Deleted {deleted} load test task(s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--api", default="http://localhost:8000/api")
+    parser.add_argument("--log", required=True, help="the simulator's --log file")
+    parser.add_argument("--bursts", default="10,50,100", help="comma-separated burst sizes, fired in order")
+    parser.add_argument("--interval", type=float, default=30, help="seconds between bursts")
+    parser.add_argument("--lead", type=float, default=10, help="seconds until the first burst is due")
+    parser.add_argument("--drain", type=float, default=60, help="seconds to wait for stragglers after the last burst")
+    parser.add_argument("--out", help="write the per-burst summary as JSON")
+    parser.add_argument("--keep", action="store_true", help="keep the tasks instead of deleting them afterwards")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.bursts.split(",")]
+    run = secrets.token_hex(3)
+    offset = os.path.getsize(args.log) if os.path.exists(args.log) else 0
+    planned = create_bursts(args.api.rstrip("/"), run, sizes, args.lead, args.interval)
+
+    cuts: Dict[str, float] = {}
+    deadline = max(due for _, due in planned.values()) + args.drain
+    while len(cuts) < len(planned) and time.time() < deadline:
+        time.sleep(1)
+        if os.path.exists(args.log):
+            new, offset = read_receipts(args.log, run, offset)
+            cuts.update(new)
+        print(f"\r{len(cuts)}/{len(planned)} printed", end="", flush=True)
+    print()
+
+    bursts = summarize(sizes, planned, cuts)
+    for b in bursts:
+        print(
+            f"burst {b['burst']}: {b['printed']}/{b['size']} printed  "
+            f"p50 {b['latency_p50']}s  p95 {b['latency_p95']}s  max {b['latency_max']}s  "
+            f"{b['receipts_per_second']} receipts/s"
+        )
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({"run": run, "interval": args.interval, "bursts": bursts}, f, indent=2)
+    if not args.keep:
+        cleanup(args.api.rstrip("/"), run)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+"""
+ESC/POS network printer simulator for load tests: a raw TCP server (port 9100 by
+default) that decodes what ThermalPrinter and /api/print-test send and records one
+entry per cut receipt.
+
+    cd backend/benchmarks && python printer_sim.py [--port 9100] [--log receipts.jsonl]
+        [--latency-ms 0] [--bytes-per-second 0] [--stall-every 0 --stall-seconds 5]
+        [--drop-rate 0] [--recv-buffer 0]
+
+Fault injection, all off by default:
+  --latency-ms        time to feed and cut each receipt; nothing is read meanwhile
+  --bytes-per-second  print head throughput; reading is paced to it
+  --stall-every N     every Nth receipt the printer stops reading for --stall-seconds,
+                      like a full buffer or a paper jam, so senders block on write
+  --drop-rate P       chance that the connection is reset while a receipt prints; that
+                      receipt and anything buffered after it are lost
+  --recv-buffer B     socket receive buffer; small values make back-pressure show sooner
+
+Each receipt is written to --log as one JSON line (lines of text, byte count,
+first byte and cut time as epoch seconds), which loadgen.py reads to measure
+fire-to-paper latency. A summary is printed every --report seconds.
+"""
+import argparse
+import asyncio
+import json
+import random
+import socket
+import struct
+import time
+from typing import List, Optional
+
+ESC, GS, DLE = 0x1B, 0x1D, 0x10
+# Parameter bytes per command; anything unknown is taken to have none
+ESC_PARAMS = {
+    ord("@"): 0, ord("a"): 1, ord("E"): 1, ord("t"): 1, ord("d"): 1, ord("!"): 1, ord("-"): 1,
+    ord("M"): 1, ord("2"): 0, ord("3"): 1, ord("G"): 1, ord("J"): 1, ord("p"): 3, ord("r"): 1,
+    ord("{"): 1, ord("R"): 1, ord("V"): 1, ord("c"): 2,
+}
+GS_PARAMS = {
+    ord("!"): 1, ord("B"): 1, ord("L"): 2, ord("W"): 2, ord("h"): 1, ord("w"): 1, ord("H"): 1,
+    ord("f"): 1, ord("b"): 1,
+}
+CODEPAGES = {0: "cp437", 2: "cp850", 16: "cp1252", 19: "cp858"}
+STATUS_ONLINE = b"\x12"
+
+
+class Receipt:
+    __slots__ = ("lines", "bytes", "first_byte_at", "cut_at")
+
+    def __init__(self):
+        self.lines: List[str] = []
+        self.bytes = 0
+        self.first_byte_at: Optional[float] = None
+        self.cut_at: Optional[float] = None
+
+
+class EscPosDecoder:
+    """
+    Incremental ESC/POS parser: text goes into the current receipt's lines, a
+    GS V cut closes the receipt. Commands split across reads are carried over.
+    """
+
+    def __init__(self):
+        self.codepage = "cp437"
+        self.receipt = Receipt()
+        self._line = bytearray()
+        self._pending = b""
+        self.replies = bytearray()
+
+    def feed(self, data: bytes) -> List[Receipt]:
+        """Consume bytes; returns the receipts completed by them."""
+        data = self._pending + data
+        self._pending = b""
+        done = []
+        i, n = 0, len(data)
+        # Start of the bytes not yet counted towards a receipt
+        counted = 0
+        while i < n:
+            if self.receipt.first_byte_at is None:
+                self.receipt.first_byte_at = time.time()
+            b = data[i]
+            if b in (ESC, GS, DLE):
+                size = self._command_size(data, i)
+                if size is None:
+                    # Incomplete command: wait for the rest
+                    self._pending = data[i:]
+                    break
+                i += size
+                if self._apply(data[i - size:i]):
+                    self.receipt.bytes += i - counted
+                    counted = i
+                    done.append(self._cut())
+                continue
+            if b == 0x0A:
+                self._newline()
+            elif b >= 0x20:
+                self._line.append(b)
+            i += 1
+        self.receipt.bytes += i - counted
+        return done
+
+    def _command_size(self, data: bytes, i: int) -> Optional[int]:
+        if i + 1 >= len(data):
+            return None
+        prefix, cmd = data[i], data[i + 1]
+        if prefix == DLE:
+            return 3 if i + 2 < len(data) else None
+        if prefix == ESC:
+            size = 2 + ESC_PARAMS.get(cmd, 0)
+        elif cmd == ord("V"):
+            # GS V m, or GS V m n for the feed-and-cut variants (m >= 65)
+            if i + 2 >= len(data):
+                return None
+            size = 4 if data[i + 2] >= 65 else 3
+        elif cmd == ord("("):
+            # GS ( fn pL pH data
+            if i + 4 >= len(data):
+                return None
+            size = 5 + data[i + 3] + data[i + 4] * 256
+        elif cmd == ord("k"):
+            return self._barcode_size(data, i)
+        else:
+            size = 2 + GS_PARAMS.get(cmd, 0)
+        return size if i + size <= len(data) else None
+
+    @staticmethod
+    def _barcode_size(data: bytes, i: int) -> Optional[int]:
+        if i + 2 >= len(data):
+            return None
+        m = data[i + 2]
+        if m <= 6:
+            # NUL-terminated data
+            end = data.find(b"\x00", i + 3)
+            return end - i + 1 if end >= 0 else None
+        if i + 3 >= len(data):
+            return None
+        return 4 + data[i + 3]
+
+    def _apply(self, command: bytes) -> bool:
+        """Act on one command; True when it cuts the paper."""
+        prefix, cmd = command[0], command[1]
+        if prefix == DLE and cmd == 0x04:
+            # DLE EOT n real-time status: always online, paper present
+            self.replies += STATUS_ONLINE
+        elif prefix == ESC and cmd == ord("t"):
+            self.codepage = CODEPAGES.get(command[2], "cp437")
+        elif prefix == ESC and cmd == ord("d"):
+            self._newline()
+            self.receipt.lines.extend([""] * max(command[2] - 1, 0))
+        elif prefix == GS and cmd == ord("V"):
+            return True
+        elif prefix == ESC and cmd == ord("@"):
+            self.codepage = "cp437"
+        return False
+
+    def _newline(self):
+        self.receipt.lines.append(self._line.decode(self.codepage, errors="replace"))
+        self._line.clear()
+
+    def _cut(self) -> Receipt:
+        if self._line:
+            self._newline()
+        receipt = self.receipt
+        receipt.cut_at = time.time()
+        while receipt.lines and not receipt.lines[-1]:
+            receipt.lines.pop()
+        self.receipt = Receipt()
+        return receipt
+
+
+class PrinterSimulator:
+    def __init__(self, args):
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.log = open(args.log, "a", buffering=1) if args.log else None
+        self.connections = 0
+        self.receipts = 0
+        self.bytes = 0
+        self.drops = 0
+        self.stalls = 0
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        connection = self.connections
+        decoder = EscPosDecoder()
+        chunk = 4096
+        if self.args.bytes_per_second:
+            # Pace in ~50 ms slices
+            chunk = max(1, min(chunk, int(self.args.bytes_per_second / 20)))
+        try:
+            while True:
+                data = await reader.read(chunk)
+                if not data:
+                    break
+                self.bytes += len(data)
+                if self.args.bytes_per_second:
+                    await asyncio.sleep(len(data) / self.args.bytes_per_second)
+                for receipt in decoder.feed(data):
+                    if self.args.drop_rate and self.rng.random() < self.args.drop_rate:
+                        # Lost mid-print, together with whatever was buffered after it
+                        self.drops += 1
+                        self._reset(writer)
+                        return
+                    await self._printed(receipt, connection)
+                if decoder.replies:
+                    writer.write(bytes(decoder.replies))
+                    decoder.replies.clear()
+                    await writer.drain()
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    def _reset(writer: asyncio.StreamWriter):
+        sock = writer.get_extra_info("socket")
+        if sock is not None:
+            # SO_LINGER 0: close with RST, like a printer dropping off the network
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+        writer.transport.abort()
+
+    async def _printed(self, receipt: Receipt, connection: int):
+        if self.args.latency_ms:
+            # Feeding and cutting; the cut time is when the paper comes out
+            await asyncio.sleep(self.args.latency_ms / 1000)
+            receipt.cut_at = time.time()
+        self.receipts += 1
+        if self.log:
+            self.log.write(json.dumps({
+                "connection": connection,
+                "first_byte_at": receipt.first_byte_at,
+                "cut_at": receipt.cut_at,
+                "bytes": receipt.bytes,
+                "lines": receipt.lines,
+            }) + "\n")
+        if self.args.stall_every and self.receipts % self.args.stall_every == 0:
+            self.stalls += 1
+            await asyncio.sleep(self.args.stall_seconds)
+
+    async def report(self):
+        last = 0
+        while True:
+            await asyncio.sleep(self.args.report)
+            print(
+                f"receipts {self.receipts} (+{self.receipts - last})  bytes {self.bytes}  "
+                f"connections {self.connections}  drops {self.drops}  stalls {self.stalls}"
+            )
+            last = self.receipts
+
+
+async def serve(args):
+    sim = PrinterSimulator(args)
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if args.recv_buffer:
+        # Set before listen() so accepted sockets inherit it
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, args.recv_buffer)
+    sock.bind((args.host, args.port))
+    server = await asyncio.start_server(sim.handle, sock=sock)
+    print(f"✅ ESC/POS simulator listening on {args.host}:{args.port}")
+    if args.report:
+        asyncio.create_task(sim.report())
+    async with server:
+        await server.serve_forever()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--log", help="append one JSON line per printed receipt")
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--bytes-per-second", type=float, default=0)
+    parser.add_argument("--stall-every", type=int, default=0)
+    parser.add_argument("--stall-seconds", type=float, default=5)
+    parser.add_argument("--drop-rate", type=float, default=0)
+    parser.add_argument("--recv-buffer", type=int, default=0)
+    parser.add_argument("--report", type=float, default=10, help="seconds between summaries (0: off)")
+    parser.add_argument("--seed", type=int, default=None)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(serve(parse_args()))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,18 @@
+import importlib
+import os
+import sys
+import tempfile
+
+import pytest
+
+# The app configures its database from the environment on import
+os.environ.setdefault("DB_PATH", os.path.join(tempfile.mkdtemp(prefix="receipttasker-tests-"), "app.db"))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+
+
+@pytest.fixture
+def main(monkeypatch, tmp_path):
+    """The FastAPI app module; it mounts the built frontend from ./static, which only the Docker image has."""
+    (tmp_path / "static").mkdir()
+    monkeypatch.chdir(tmp_path)
+    return importlib.import_module("main")
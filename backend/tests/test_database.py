@@ -0,0 +1,19 @@
+import threading
+
+from fastapi.testclient import TestClient
+
+import database
+
+
+def test_production_profile_serves_async_routes(monkeypatch, main):
+    monkeypatch.setattr(database, "DB_PROFILE", "production")
+    # A fresh async engine, built with the production pool settings
+    monkeypatch.setattr(database, "_async_engine", None)
+    database.init_db()
+    ready = threading.Event()
+    ready.set()
+    monkeypatch.setattr(main, "_ready", ready)
+
+    response = TestClient(main.app).get("/api/tasks")
+    assert response.status_code == 200
+    assert database.get_async_engine().pool.size() == database.DB_POOL_SIZE
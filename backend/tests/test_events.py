@@ -0,0 +1,41 @@
+from events import EventBus, _RESYNC, _Subscriber
+
+
+def _replayed(bus: EventBus, last_event_id):
+    sub = _Subscriber()
+    bus._replay(sub, last_event_id)
+    return list(sub.frames)
+
+
+def _ids(frames):
+    return [frame.split("\n", 1)[0] for frame in frames]
+
+
+def test_replays_missed_events():
+    bus = EventBus()
+    for n in range(3):
+        bus._dispatch("task.updated", {"id": n})
+    assert _ids(_replayed(bus, f"{bus._epoch}-1")) == [f"id: {bus._epoch}-2", f"id: {bus._epoch}-3"]
+    assert _replayed(bus, f"{bus._epoch}-3") == []
+    assert _replayed(bus, None) == []
+
+
+def test_resyncs_ids_from_before_a_restart():
+    before = EventBus()
+    for n in range(50):
+        before._dispatch("task.updated", {"id": n})
+    restarted = EventBus()
+    restarted._dispatch("task.updated", {"id": 1})
+    # Higher, lower and equal numbers from the old process all mean "refetch"
+    for number in (50, 1, 0):
+        assert _replayed(restarted, f"{before._epoch}-{number}") == [_RESYNC]
+    # Plain numeric ids as sent before epochs existed
+    assert _replayed(restarted, "50") == [_RESYNC]
+
+
+def test_resyncs_when_missed_events_are_gone():
+    bus = EventBus()
+    bus._recent = type(bus._recent)(maxlen=2)
+    for n in range(5):
+        bus._dispatch("task.updated", {"id": n})
+    assert _replayed(bus, f"{bus._epoch}-1") == [_RESYNC]
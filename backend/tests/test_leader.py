@@ -0,0 +1,50 @@
+import time
+from datetime import timedelta
+
+import pytest
+
+import scheduling
+from crud import create_task, get_task
+from database import init_db
+from leader import LeaderElection
+from models import Task
+from utils import now_tz
+
+
+@pytest.fixture
+def election(monkeypatch):
+    init_db()
+    monkeypatch.setattr(scheduling, "POLL_INTERVAL_SECONDS", 0.5)
+
+    def lead():
+        scheduling.rehydrate()
+        scheduling.start()
+
+    scheduling.standby()
+    # Long heartbeat: the test drives the rounds itself
+    election = LeaderElection("test-scheduler", lead, scheduling.standby, heartbeat_seconds=60)
+    yield election
+    election.stop()
+
+
+def _beat(election: LeaderElection):
+    election._beat()
+    election._starter.join()
+
+
+@pytest.mark.parametrize("mode", ["jobs", "poll", "heap"])
+def test_task_fires_after_step_down_and_reelection(election, monkeypatch, mode):
+    monkeypatch.setattr(scheduling, "SCHEDULER_MODE", mode)
+    _beat(election)
+    assert election.leading
+    election._demote("lease could not be renewed")
+    _beat(election)
+    assert election.leading and election.terms == 2
+
+    task = create_task(Task(title="after re-election", start_at=now_tz() + timedelta(seconds=1), auto_print=False))
+    scheduling.schedule_task(task)
+
+    deadline = time.monotonic() + 5
+    while get_task(task.id).last_fired_at is None:
+        assert time.monotonic() < deadline, f"task never fired after re-election ({mode} mode)"
+        time.sleep(0.1)
@@ -0,0 +1,30 @@
+from datetime import datetime, timedelta, timezone
+
+import crud
+import database
+import occurrences
+import rrules
+from models import Task
+
+
+def test_fires_keep_the_cached_windows():
+    database.init_db()
+    start = datetime(2026, 1, 5, 8, 0, tzinfo=timezone.utc)
+    task = crud.create_task(Task(title="Occurrence cache", rrule="FREQ=DAILY", start_at=start))
+    window = (start, start + timedelta(days=7))
+    occurrences.expand_task(task, *window)
+    assert task.id in occurrences._cache
+
+    crud.update_task(task.id, next_run_at=start + timedelta(days=1), last_fired_at=start)
+    assert task.id in occurrences._cache
+
+    crud.update_task(task.id, title="Occurrence cache, renamed")
+    assert task.id not in occurrences._cache
+
+
+def test_expansion_starts_near_the_window():
+    start = datetime(2024, 3, 1, 8, 0, tzinfo=timezone.utc)
+    task = Task(id=-1, title="Hourly", rrule="FREQ=HOURLY;INTERVAL=5", start_at=start)
+    window = (datetime(2026, 3, 28, 0, 0, tzinfo=timezone.utc), datetime(2026, 4, 2, 0, 0, tzinfo=timezone.utc))
+    rule = rrules.compile_rrule(task.rrule, task.start_at, task.until)
+    assert occurrences._expand(task, *window) == rule.between(*window, inc=True)
@@ -0,0 +1,46 @@
+from datetime import datetime, timedelta, timezone
+
+from dateutil.rrule import rrule
+
+import rrules
+from utils import to_aware
+
+RULES = [
+    "FREQ=DAILY",
+    "FREQ=DAILY;BYHOUR=2,14;BYMINUTE=30",
+    "FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,TH",
+    "FREQ=HOURLY;INTERVAL=5",
+    "FREQ=MONTHLY;BYMONTHDAY=31",
+    "FREQ=MONTHLY;BYDAY=1MO",
+    "FREQ=YEARLY",
+    "FREQ=DAILY;COUNT=30",
+]
+
+
+def test_next_after_matches_dateutil_across_dst():
+    start = to_aware(datetime(2024, 1, 31, 2, 30))
+    until = to_aware(datetime(2026, 10, 25, 2, 45))
+    # Hours around the spring and autumn clock changes, and a year later
+    cursors = [datetime(2026, 3, 29, 0, 0, tzinfo=timezone.utc) + timedelta(minutes=20 * i) for i in range(12)]
+    cursors += [datetime(2026, 10, 25, 0, 0, tzinfo=timezone.utc) + timedelta(minutes=20 * i) for i in range(12)]
+    cursors.append(datetime(2027, 6, 1, tzinfo=timezone.utc))
+    for rule_str in RULES:
+        for bound in (None, until):
+            rule = rrules.compile_rrule(rule_str, start, bound)
+            for cursor in cursors:
+                assert rrules.next_after(rule, cursor) == rule.after(cursor), (rule_str, bound, cursor)
+
+
+def test_same_shape_is_reanchored_without_rebuilding(monkeypatch):
+    rrules.compile_rrule("FREQ=WEEKLY;BYDAY=MO,WE", to_aware(datetime(2025, 5, 5, 9, 0)))
+    rrules.compile_rrule("FREQ=WEEKLY;BYDAY=MO,WE", to_aware(datetime(2025, 5, 6, 9, 0)))
+
+    def rebuild(*args, **kwargs):
+        raise AssertionError("rule rebuilt")
+
+    monkeypatch.setattr(rrule, "replace", rebuild)
+    # Same rule string, zone and time of day as an earlier task: only dtstart differs
+    rule = rrules.compile_rrule("FREQ=WEEKLY;BYDAY=MO,WE", to_aware(datetime(2025, 9, 2, 9, 0)))
+    cursor = datetime(2026, 2, 4, 12, 0, tzinfo=timezone.utc)
+    assert rrules.next_after(rule, cursor) == to_aware(datetime(2026, 2, 9, 9, 0))
+    assert rrules.fast_forward(rule, cursor).after(cursor) == to_aware(datetime(2026, 2, 9, 9, 0))
@@ -0,0 +1,28 @@
+from datetime import datetime, timezone
+
+import crud
+import database
+from models import Task
+
+
+def _titles(search):
+    return [t.title for t in crud.list_tasks(search=search) if t.title.startswith("Search test")]
+
+
+def test_search_matches_words_prefixes_and_substrings():
+    database.init_db()
+    now = datetime.now(timezone.utc)
+    for title, description in [
+        ("Search test: stofzuigen", "woonkamer en gang"),
+        ("Search test: trap", "zuig de treden"),
+        ("Search test: ramen", "zeem en emmer"),
+    ]:
+        crud.create_task(Task(title=title, description=description, start_at=now))
+    assert database.FTS_ENABLED and database.FTS_TRIGRAM
+    # Word matches first, then "zuig" inside the compound word
+    assert _titles("zuig") == ["Search test: trap", "Search test: stofzuigen"]
+    assert _titles("tofzuig") == ["Search test: stofzuigen"]
+    assert _titles("woonk gang") == ["Search test: stofzuigen"]
+    # Too short for the trigram index: whole-word prefixes only
+    assert sorted(_titles("en")) == ["Search test: ramen", "Search test: stofzuigen"]
+    assert _titles("zuigmond") == []
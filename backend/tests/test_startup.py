@@ -0,0 +1,24 @@
+import time
+
+from fastapi.testclient import TestClient
+
+
+def test_failure_after_the_database_is_reported_and_shut_down(monkeypatch, main):
+    def broken_start():
+        raise RuntimeError("election broke")
+
+    stopped = []
+    monkeypatch.setattr(main.election, "start", broken_start)
+    monkeypatch.setattr(main, "_shutdown", lambda: stopped.append(True))
+    monkeypatch.setattr(main, "_startup_error", None)
+    with TestClient(main.app) as client:
+        # The lifespan hands the bootstrap to a thread; wait for it to give up
+        for _ in range(100):
+            if main._startup_error:
+                break
+            time.sleep(0.05)
+        response = client.get("/api/live")
+        assert response.status_code == 503
+        assert response.json()["error"] == "election broke"
+        assert client.get("/api/ready").status_code == 503
+    assert stopped == [True]
@@ -28,6 +28,22 @@ export default function App() {
     load(searchQuery, selectedCategory) 
   }, [searchQuery, selectedCategory])
 
+  // Live updates: reload when tasks change or fire instead of polling
+  React.useEffect(() => {
+    const source = new EventSource(`${api.defaults.baseURL}/events`)
+    let timer: ReturnType<typeof setTimeout> | undefined
+    const reload = () => {
+      clearTimeout(timer)
+      timer = setTimeout(() => load(searchQuery, selectedCategory), 250)
+    }
+    const types = ['task.created', 'task.updated', 'task.deleted', 'tasks.created', 'tasks.rescheduled', 'task.fired', 'tasks.fired', 'resync']
+    types.forEach(type => source.addEventListener(type, reload))
+    return () => {
+      clearTimeout(timer)
+      source.close()
+    }
+  }, [searchQuery, selectedCategory])
+
   const create = async (t: TaskCreate) => {
     await api.post('/tasks', t)
     await load(searchQuery, selectedCategory)
@@ -52,7 +68,7 @@ export default function App() {
               onSearchChange={setSearchQuery}
               onCategoryChange={setSelectedCategory}
             />
-            <CalendarView tasks={tasks} />
+            <CalendarView tasks={tasks} category={selectedCategory} />
             <TaskList tasks={tasks} refresh={() => load(searchQuery, selectedCategory)} />
           </div>
           <div className="space-y-6">
@@ -43,6 +43,7 @@ export default function TaskList({ tasks, refresh }: Props) {
                   <div className="text-xs text-gray-500 dark:text-gray-400">
                     Start {new Date(t.start_at).toLocaleString()} 
                     {t.rrule && ` • RRULE ${t.rrule}`}
+                    {t.is_active && t.next_run_at && ` • Next ${new Date(t.next_run_at).toLocaleString()}`}
                     {!t.is_active && ' • Inactive'}
                   </div>
                 </div>
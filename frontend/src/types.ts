@@ -8,10 +8,11 @@ export type Task = {
   auto_print: boolean;
   is_active: boolean;
   last_fired_at?: string | null;
+  next_run_at?: string | null;
   category: string;
 };
 
-export type TaskCreate = Omit<Task, 'id' | 'last_fired_at'>;
+export type TaskCreate = Omit<Task, 'id' | 'last_fired_at' | 'next_run_at'>;
 
 export type BlackoutPeriod = {
   id: number;